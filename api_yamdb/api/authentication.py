@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users.models import User
+
+from .cache import CacheGeneration, LocalLRUCache
+
+TOKEN_VERSION_CLAIM = 'token_version'
+
+# Fields the permission classes need, in the order of User fields.
+USER_PROJECTION = tuple(
+    field.attname for field in User._meta.concrete_fields
+    if field.attname in (
+        'id', 'username', 'role', 'is_superuser', 'is_active',
+        'token_version',
+    )
+)
+
+user_cache = LocalLRUCache(
+    settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL
+)
+
+
+def get_user_generation(user_id):
+    """Shared counter bumped on every save or delete of the user."""
+    return CacheGeneration(f'user:{user_id}', 'AUTH_USER_CACHE_ALIAS')
+
+
+def get_tokens_for_user(user):
+    refresh = RefreshToken.for_user(user)
+    refresh[TOKEN_VERSION_CLAIM] = user.token_version
+    return refresh
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication which resolves users from a process-local cache.
+
+    request.user is a User with only USER_PROJECTION loaded, the other
+    fields are deferred. Entries are keyed by the user id, the token
+    version and the user's generation in the shared AUTH_USER_CACHE_ALIAS
+    cache. Saving or deleting a user bumps the generation, so every
+    process reloads the user on its next request; a request costs one
+    shared cache read instead of a query.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+        version = validated_token.get(TOKEN_VERSION_CLAIM, 0)
+        # Read before the user, so a concurrent change is never cached
+        # under the generation it bumps.
+        generation = get_user_generation(user_id).get()
+        values = user_cache.get(user_id, (version, generation))
+        if values is None:
+            values = User.objects.filter(
+                **{api_settings.USER_ID_FIELD: user_id}
+            ).values_list(*USER_PROJECTION).first()
+            if values is None:
+                raise AuthenticationFailed(
+                    _('User not found'), code='user_not_found'
+                )
+            user_cache.set(user_id, (version, generation), values)
+        user = User.from_db(DEFAULT_DB_ALIAS, USER_PROJECTION, values)
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+        if version < user.token_version:
+            raise AuthenticationFailed(
+                _('Token is outdated'), code='token_outdated'
+            )
+        return user
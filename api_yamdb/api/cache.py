@@ -0,0 +1,164 @@
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .metrics import cache_requests
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+class CacheGeneration:
+    """
+    Shared counter that changes whenever data of a namespace changes.
+
+    Cache keys and ETags embed the current generation, so invalidation is
+    a single counter bump and never has to enumerate keys.
+    """
+
+    def __init__(self, namespace, alias_setting='RESPONSE_CACHE_ALIAS'):
+        self.key = f'generation:{namespace}'
+        self.alias_setting = alias_setting
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, self.alias_setting)]
+
+    def get(self):
+        generation = self.cache.get(self.key)
+        if generation is None:
+            # Start from the clock, so an evicted counter never reuses
+            # a generation that is still referenced somewhere.
+            generation = time.time_ns()
+            self.cache.add(self.key, generation, None)
+        return generation
+
+    def bump(self):
+        try:
+            self.cache.incr(self.key)
+        except ValueError:
+            self.get()
+
+
+class ResponseCache:
+    """
+    Cache of serialized list responses keyed by the query string.
+
+    Entries are also dropped when any generation in depends_on changes.
+    Hits and misses are counted in cache_requests, which /metrics
+    exposes as response_cache_requests_total.
+    """
+
+    def __init__(self, namespace, depends_on=()):
+        self.namespace = namespace
+        self.generation = CacheGeneration(namespace)
+        self.depends_on = depends_on
+
+    def make_key(self, request):
+        """
+        Key of the response to request under the current generations.
+
+        Make the key once per request and pass it to both get() and
+        set(), so a response built before a write is never stored under
+        the generation that write created. Paginated responses contain
+        absolute links, so the key includes the scheme and host.
+        """
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        generations = '.'.join(
+            str(generation.get())
+            for generation in (self.generation, *self.depends_on)
+        )
+        origin = f'{request.scheme}://{request.get_host()}'
+        return (
+            f'response-cache:{self.namespace}:{generations}:'
+            f'{origin}:{query}'
+        )
+
+    def get(self, key):
+        data = get_cache().get(key)
+        cache_requests.inc(
+            (self.namespace, 'miss' if data is None else 'hit')
+        )
+        return data
+
+    def set(self, key, data):
+        get_cache().set(key, data, settings.RESPONSE_CACHE_TIMEOUT)
+
+    def invalidate(self):
+        self.generation.bump()
+
+    def stats(self):
+        """Return hits and misses of this process."""
+        values = cache_requests.snapshot()
+        return {
+            'hits': values.get((self.namespace, 'hit'), [0])[0],
+            'misses': values.get((self.namespace, 'miss'), [0])[0],
+        }
+
+
+class LocalLRUCache:
+    """
+    Process-local cache of at most maxsize entries, each kept for ttl
+    seconds.
+
+    An entry is stored under a key together with a version; a lookup
+    with another version is a miss.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry_version, value, expires = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            if entry_version != version:
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, version, value):
+        with self._lock:
+            self._entries[key] = (
+                version, value, time.monotonic() + self.ttl
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def get_title_generation(title_id):
+    """Counter bumped on every write of reviews or comments of a title."""
+    return CacheGeneration(f'title:{title_id}')
+
+
+category_cache = ResponseCache('categories')
+genre_cache = ResponseCache('genres')
+title_generation = CacheGeneration('titles')
+# Reviews do not change facet counts, so only title writes invalidate
+# the facets and not title_generation.
+title_facet_cache = ResponseCache(
+    'title-facets',
+    depends_on=(category_cache.generation, genre_cache.generation)
+)
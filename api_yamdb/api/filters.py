@@ -1,6 +1,16 @@
+from django import forms
 from django_filters import rest_framework as filters
 
 from reviews.models import Title
+from reviews.search import search_titles
+
+
+class IntegerFilter(filters.NumberFilter):
+    field_class = forms.IntegerField
+
+
+class IntegerInFilter(filters.BaseInFilter, IntegerFilter):
+    pass
 
 
 class TitleFilter(filters.FilterSet):
@@ -16,11 +26,26 @@ class TitleFilter(filters.FilterSet):
         field_name='name',
         lookup_expr='icontains'
     )
-    year = filters.NumberFilter(
+    year = IntegerFilter(
+        field_name='year'
+    )
+    year_min = IntegerFilter(
         field_name='year',
-        lookup_expr='icontains'
+        lookup_expr='gte'
     )
+    year_max = IntegerFilter(
+        field_name='year',
+        lookup_expr='lte'
+    )
+    year__in = IntegerInFilter(
+        field_name='year',
+        lookup_expr='in'
+    )
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
         fields = '__all__'
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
@@ -0,0 +1,91 @@
+import time
+
+from django.core.management import BaseCommand
+from rest_framework.test import APIRequestFactory
+
+from api.throttling import (SignupThrottle, TokenThrottle,
+                            TokenUsernameThrottle)
+from api.views import TokenView
+
+
+class Command(BaseCommand):
+    """
+    Measures the per-request overhead of the token bucket throttles via
+    the following command:
+    python manage.py benchmark_throttle --requests 10000.
+
+    Requests carry no data, so TokenView answers 400 without touching
+    the database and the difference between the runs is the throttling
+    itself. Throttle rates are raised for the run, so no request is
+    rejected.
+    """
+    help = "Benchmark the overhead of request throttling."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=10_000)
+        parser.add_argument('--clients', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        clients = options['clients']
+        rate = f'{count * 10}/second'
+        throttles = (SignupThrottle, TokenThrottle, TokenUsernameThrottle)
+        saved = [throttle.__dict__.get('rate') for throttle in throttles]
+        for throttle in throttles:
+            throttle.rate = rate
+        try:
+            self.report('allow_request', self.time_allow_request(
+                count, clients
+            ), count)
+            plain = self.time_view(
+                TokenView.as_view(throttle_classes=()), count, clients
+            )
+            throttled = self.time_view(
+                TokenView.as_view(), count, clients
+            )
+        finally:
+            for throttle, rate in zip(throttles, saved):
+                if rate is None:
+                    del throttle.rate
+                else:
+                    throttle.rate = rate
+        self.report('TokenView without throttles', plain, count)
+        self.report('TokenView with throttles', throttled, count)
+        self.stdout.write(self.style.SUCCESS(
+            f'Overhead: {(throttled - plain) / count * 1e6:.1f} us/request'
+        ))
+
+    @staticmethod
+    def make_request(factory, number, clients):
+        return factory.post(
+            '/api/v1/auth/token/', {},
+            REMOTE_ADDR=f'10.0.{number % clients // 256}.{number % 256}'
+        )
+
+    def time_allow_request(self, count, clients):
+        factory = APIRequestFactory()
+        requests = [
+            self.make_request(factory, number, clients)
+            for number in range(count)
+        ]
+        throttle = SignupThrottle()
+        started = time.perf_counter()
+        for request in requests:
+            throttle.allow_request(request, None)
+        return time.perf_counter() - started
+
+    def time_view(self, view, count, clients):
+        factory = APIRequestFactory()
+        requests = [
+            self.make_request(factory, number, clients)
+            for number in range(count)
+        ]
+        started = time.perf_counter()
+        for request in requests:
+            view(request)
+        return time.perf_counter() - started
+
+    def report(self, name, elapsed, count):
+        self.stdout.write(
+            f'{name}: {elapsed:.3f}s, {elapsed / count * 1e6:.1f} us/request'
+        )
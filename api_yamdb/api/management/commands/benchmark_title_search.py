@@ -0,0 +1,81 @@
+import random
+import time
+from itertools import islice
+
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from api.filters import TitleFilter
+from reviews.models import Title
+from reviews.search import get_backend
+
+SYLLABLES = ('ka', 'ro', 'mi', 'te', 'su', 'na', 'lo', 'vi', 'de', 'gar')
+
+
+class Command(BaseCommand):
+    """
+    Compares the full-text `search` filter of titles with the `name`
+    icontains filter via the following command:
+    python manage.py benchmark_title_search --titles 1000000.
+
+    Synthetic titles are created inside a transaction which is rolled
+    back at the end, so the database is left untouched.
+    """
+    help = "Benchmark full-text title search against icontains."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1_000_000)
+        parser.add_argument('--queries', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rnd = random.Random(options['seed'])
+        words = [
+            ''.join(rnd.choices(SYLLABLES, k=rnd.randint(2, 4)))
+            for _ in range(5000)
+        ]
+        with transaction.atomic():
+            started = time.perf_counter()
+            self.populate(rnd, words, options['titles'],
+                          options['batch_size'])
+            get_backend().rebuild()
+            self.stdout.write(
+                f"Created and indexed {options['titles']} titles in "
+                f'{time.perf_counter() - started:.1f}s.'
+            )
+            queries = rnd.sample(words, options['queries'])
+            for param in ('name', 'search'):
+                self.report(param, queries)
+            transaction.set_rollback(True)
+
+    def populate(self, rnd, words, count, batch_size):
+        titles = (
+            Title(
+                name=' '.join(rnd.choices(words, k=3)),
+                year=rnd.randint(1900, 2024),
+                description=' '.join(rnd.choices(words, k=12))
+            )
+            for _ in range(count)
+        )
+        while True:
+            batch = list(islice(titles, batch_size))
+            if not batch:
+                break
+            Title.objects.bulk_create(batch)
+
+    def report(self, param, queries):
+        timings = []
+        for query in queries:
+            started = time.perf_counter()
+            queryset = TitleFilter(
+                {param: query}, queryset=Title.objects.all()
+            ).qs
+            queryset.count()
+            list(queryset[:10])
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        self.stdout.write(
+            f'{param:>6}: median {timings[len(timings) // 2] * 1000:.1f}ms, '
+            f'max {timings[-1] * 1000:.1f}ms over {len(timings)} queries'
+        )
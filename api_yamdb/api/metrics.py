@@ -0,0 +1,308 @@
+"""
+Request latency and response cache metrics in the Prometheus text
+exposition format.
+
+Every process keeps its metrics in memory. With settings.METRICS_DIR
+set, a process also dumps them to its own file in that directory at
+most every METRICS_FLUSH_INTERVAL seconds, and a scrape merges the
+files of all processes, e.g. all gunicorn workers. Percentiles are
+computed by Prometheus with histogram_quantile().
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:
+    # Not a POSIX system, files of stopped processes are left as is.
+    fcntl = None
+
+BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Other methods share one label value to keep the label set bounded.
+METHODS = ('GET', 'HEAD', 'OPTIONS', 'POST', 'PUT', 'PATCH', 'DELETE')
+
+
+class Metric:
+    """
+    Values per label set.
+
+    Values are lists of numbers, so dumps of several processes are
+    merged by adding them element-wise.
+    """
+    type = None
+
+    def __init__(self, name, documentation, label_names):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        with self._lock:
+            return {labels: list(values)
+                    for labels, values in self._values.items()}
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self, values):
+        """Return exposition lines of merged values."""
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.type}',
+        ]
+        for labels, counts in sorted(values.items()):
+            label_text = ','.join(
+                f'{name}="{escape(value)}"'
+                for name, value in zip(self.label_names, labels)
+            )
+            lines.extend(self.render_sample(label_text, counts))
+        return lines
+
+
+class Counter(Metric):
+    """Counter per label set, values are a list of a single count."""
+    type = 'counter'
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            values = self._values.setdefault(labels, [0])
+            values[0] += amount
+
+    def render_sample(self, label_text, counts):
+        return [f'{self.name}{{{label_text}}} {counts[0]}']
+
+
+class Histogram(Metric):
+    """
+    Histogram per label set.
+
+    Values are a list of per-bucket counts, including the +Inf bucket,
+    followed by the sum of observations. An observation only takes a
+    bisect and one short lock.
+    """
+    type = 'histogram'
+
+    def __init__(self, name, documentation, label_names, buckets=BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = buckets
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            values = self._values.get(labels)
+            if values is None:
+                values = [0] * (len(self.buckets) + 1) + [0.0]
+                self._values[labels] = values
+            values[index] += 1
+            values[-1] += value
+
+    def render_sample(self, label_text, counts):
+        lines = []
+        bounds = [*map(str, self.buckets), '+Inf']
+        total = 0
+        for bound, count in zip(bounds, counts):
+            total += count
+            lines.append(
+                f'{self.name}_bucket{{{label_text},le="{bound}"}} {total}'
+            )
+        lines.append(f'{self.name}_sum{{{label_text}}} {counts[-1]}')
+        lines.append(f'{self.name}_count{{{label_text}}} {total}')
+        return lines
+
+
+def escape(value):
+    return (
+        str(value).replace('\\', r'\\').replace('"', r'\"')
+        .replace('\n', r'\n')
+    )
+
+
+def merge_values(merged, dump):
+    """
+    Add a dump of {name: [[labels, values], ...]} to merged values of
+    {name: {labels: values}} in place.
+    """
+    if not isinstance(dump, dict):
+        return merged
+    for name, pairs in dump.items():
+        totals = merged.setdefault(name, {})
+        for labels, values in pairs:
+            labels = tuple(labels)
+            total = totals.get(labels)
+            totals[labels] = values if total is None else [
+                a + b for a, b in zip(total, values)
+            ]
+    return merged
+
+
+def is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class FileStore:
+    """
+    One JSON file per process in settings.METRICS_DIR with the values
+    of all metrics.
+
+    A process only writes its own file and replaces it atomically, so
+    readers never see a partial dump. The totals of stopped processes
+    are moved to the archive file, so their requests still count, their
+    files do not pile up and a new process with a reused pid does not
+    overwrite them.
+    """
+
+    ARCHIVE = 'archive'
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.flushed = 0.0
+        self.pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self):
+        return settings.METRICS_DIR
+
+    def get_path(self, name):
+        return os.path.join(self.directory, f'{name}.json')
+
+    @staticmethod
+    def read(path):
+        try:
+            with open(path) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def write(path, merged):
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as file:
+            json.dump({
+                name: [[labels, values] for labels, values in values.items()]
+                for name, values in merged.items()
+            }, file)
+        os.replace(temporary, path)
+
+    def snapshot(self):
+        return {metric.name: metric.snapshot() for metric in self.metrics}
+
+    @contextmanager
+    def lock_directory(self):
+        with open(os.path.join(self.directory, '.lock'), 'a') as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            yield
+
+    def archive(self, pid):
+        """Move the totals of a stopped process to the archive file."""
+        if fcntl is None:
+            return
+        with self.lock_directory():
+            # Checked again under the lock, a new process may have got
+            # the pid and written its file in the meantime.
+            if pid != os.getpid() and is_running(pid):
+                return
+            path = self.get_path(pid)
+            if not os.path.exists(path):
+                return
+            dump = self.read(path)
+            if dump:
+                archive = self.get_path(self.ARCHIVE)
+                self.write(archive, merge_values(
+                    merge_values({}, self.read(archive)), dump
+                ))
+            os.remove(path)
+
+    def flush(self, force=False):
+        if not self.directory:
+            return
+        now = time.monotonic()
+        if not force and now - self.flushed < settings.METRICS_FLUSH_INTERVAL:
+            return
+        with self._lock:
+            self.flushed = now
+            if self.pid != os.getpid():
+                # A file under our pid was left by a stopped process.
+                self.archive(os.getpid())
+                self.pid = os.getpid()
+            self.write(self.get_path(self.pid), self.snapshot())
+
+    def collect(self):
+        """Return values of all processes summed per metric and labels."""
+        if not self.directory:
+            return self.snapshot()
+        self.flush(force=True)
+        if fcntl is not None:
+            for name in os.listdir(self.directory):
+                pid = name[:-len('.json')]
+                if (name.endswith('.json') and pid.isdigit()
+                        and not is_running(int(pid))):
+                    self.archive(int(pid))
+        merged = {}
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                merge_values(
+                    merged, self.read(os.path.join(self.directory, name))
+                )
+        return merged
+
+
+request_latency = Histogram(
+    'http_request_duration_seconds',
+    'Request latency by viewset action, method and status code.',
+    ('handler', 'method', 'status')
+)
+cache_requests = Counter(
+    'response_cache_requests_total',
+    'Response cache lookups by cache and result.',
+    ('cache', 'result')
+)
+store = FileStore((request_latency, cache_requests))
+atexit.register(store.flush, True)
+
+
+def get_handler_name(view_func, method):
+    """Return 'ViewSet.action' for viewsets, the view name otherwise."""
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return getattr(view_func, '__name__', 'unknown')
+    action = (getattr(view_func, 'actions', None) or {}).get(method.lower())
+    if action:
+        return f'{view_class.__name__}.{action}'
+    return view_class.__name__
+
+
+def observe_request(handler, method, status, duration):
+    if method not in METHODS:
+        method = 'other'
+    request_latency.observe((handler, method, str(status)), duration)
+    store.flush()
+
+
+def render_metrics():
+    merged = store.collect()
+    lines = []
+    for metric in store.metrics:
+        lines.extend(metric.render(merged.get(metric.name, {})))
+    return '\n'.join(lines) + '\n'
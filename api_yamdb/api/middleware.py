@@ -0,0 +1,114 @@
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import get_handler_name, observe_request
+
+logger = logging.getLogger('api.requests')
+
+
+class QueryStats:
+    """Execute wrapper counting queries and their time."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.statements[sql] += 1
+
+    def get_duplicates(self):
+        """Statements run more than once, the usual sign of N+1 queries."""
+        return {
+            sql: count for sql, count in self.statements.most_common()
+            if count > 1
+        }
+
+
+class QueryStatsMiddleware:
+    """
+    Adds a Server-Timing header with the query count, DB time and total
+    time of every request.
+
+    A JSON log line with duplicate statements is written for a
+    QUERY_STATS_SAMPLE_RATE share of requests, and as a warning for
+    every request slower than QUERY_STATS_SLOW_REQUEST seconds. Queries
+    run while a streaming response is consumed are not counted.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+        if settings.QUERY_STATS_SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'db;dur={stats.duration * 1000:.1f};'
+                f'desc="{stats.count} queries", '
+                f'total;dur={duration * 1000:.1f}'
+            )
+        slow = duration >= settings.QUERY_STATS_SLOW_REQUEST
+        if slow or random.random() < settings.QUERY_STATS_SAMPLE_RATE:
+            self.log(request, response, stats, duration, slow)
+        return response
+
+    @staticmethod
+    def log(request, response, stats, duration, slow):
+        duplicates = stats.get_duplicates()
+        logger.log(
+            logging.WARNING if slow else logging.INFO,
+            json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'duration_ms': round(duration * 1000, 1),
+                'db_ms': round(stats.duration * 1000, 1),
+                'queries': stats.count,
+                'duplicate_queries': sum(duplicates.values()),
+                'duplicates': [
+                    {'sql': sql[:200], 'count': count}
+                    for sql, count in list(duplicates.items())[:3]
+                ],
+                'slow': slow,
+            }, ensure_ascii=False)
+        )
+
+
+class MetricsMiddleware:
+    """Observes request latency per viewset action, see api.metrics."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        observe_request(
+            getattr(request, 'metrics_handler', 'unmatched'),
+            request.method,
+            response.status_code,
+            time.perf_counter() - started
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.metrics_handler = get_handler_name(view_func, request.method)
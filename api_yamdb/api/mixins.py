@@ -1,13 +1,121 @@
-from rest_framework import serializers
+import hashlib
+
+from django.utils.http import parse_etags
+from rest_framework import serializers, status
 from rest_framework.mixins import (CreateModelMixin, DestroyModelMixin,
                                    ListModelMixin)
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
 
-class CreateListDestroyViewSet(CreateModelMixin, ListModelMixin,
+class MemoizedObjectMixin:
+    """
+    Resolve the object of a detail request only once.
+
+    A view instance serves a single request, so the object and its
+    permission check are reused by every later get_object() call.
+    """
+
+    def get_object(self):
+        if not hasattr(self, '_object'):
+            self._object = super().get_object()
+        return self._object
+
+
+class NestedParentMixin:
+    """
+    Resolve parent objects of nested routes once per request.
+
+    parent_lookups maps a parent name to a queryset and a mapping of its
+    lookups to URL kwargs. Several kwargs are checked by the same query,
+    so a title/review pair is validated with a single SELECT.
+    """
+    parent_lookups = {}
+
+    def get_parent(self, name):
+        parents = self.__dict__.setdefault('_parents', {})
+        if name not in parents:
+            queryset, lookups = self.parent_lookups[name]
+            parents[name] = get_object_or_404(queryset, **{
+                lookup: self.kwargs[kwarg]
+                for lookup, kwarg in lookups.items()
+            })
+        return parents[name]
+
+
+class CachedListMixin:
+    """Serve list responses from the view's response_cache, if set."""
+    response_cache = None
+
+    def list(self, request, *args, **kwargs):
+        if self.response_cache is None:
+            return super().list(request, *args, **kwargs)
+        key = self.response_cache.make_key(request)
+        data = self.response_cache.get(key)
+        if data is not None:
+            return Response(data, headers={'X-Cache': 'HIT'})
+        response = super().list(request, *args, **kwargs)
+        self.response_cache.set(key, response.data)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Answer GET with 304 Not Modified when If-None-Match matches the ETag
+    built from get_etag_parts(), before any query for the body is run.
+    """
+
+    def get_etag_parts(self):
+        """Return cheap version stamps of the response or None."""
+        return None
+
+    def get_etag(self, request):
+        parts = self.get_etag_parts()
+        if parts is None:
+            return None
+        source = '|'.join((
+            *map(str, parts),
+            request.get_full_path(),
+            request.accepted_renderer.format,
+        ))
+        return 'W/"%s"' % hashlib.md5(source.encode()).hexdigest()
+
+    def conditional(self, handler, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+        client_etags = parse_etags(request.headers.get('If-None-Match', ''))
+        if etag in client_etags or '*' in client_etags:
+            return Response(
+                status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag}
+            )
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response['ETag'] = etag
+        return response
+
+
+class ConditionalListMixin(ConditionalGetMixin):
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+
+class ConditionalRetrieveMixin(ConditionalGetMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+
+class CreateListDestroyViewSet(ConditionalListMixin, CachedListMixin,
+                               CreateModelMixin, ListModelMixin,
                                DestroyModelMixin, GenericViewSet):
     """Custom viewset for genres and categories"""
-    pass
+
+    def get_etag_parts(self):
+        if self.response_cache is None:
+            return None
+        return (self.response_cache.generation.get(),)
 
 
 class AuthorMixin(metaclass=serializers.SerializerMetaclass):
@@ -0,0 +1,149 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (Cursor, CursorPagination,
+                                       PageNumberPagination)
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Keyset pagination ordered by the view's cursor_ordering.
+
+    DRF's CursorPagination only compares the first ordering field and
+    falls back to an offset among equal values. Here the cursor holds the
+    values of all ordering fields of the boundary row, and a page is
+    filtered by the tuple comparison (a > x) OR (a = x AND b > y), so
+    rows added or deleted elsewhere never shift a page. The last
+    ordering field has to be unique.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        return view.cursor_ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, position = False, None
+        else:
+            reverse = self.cursor.reverse
+            position = self.decode_position(self.cursor.position)
+        ordering = self.ordering
+        if reverse:
+            ordering = [
+                field[1:] if field.startswith('-') else f'-{field}'
+                for field in ordering
+            ]
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            try:
+                queryset = queryset.filter(
+                    self.get_keyset_filter(position, reverse)
+                )
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_following = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = position is not None
+        if (self.has_previous or self.has_next) and self.template:
+            self.display_page_controls = True
+        return self.page
+
+    def get_keyset_filter(self, position, reverse):
+        """Rows after position in the ordering, before it if reverse."""
+        query = None
+        for field, value in reversed(list(zip(self.ordering, position))):
+            descending = field.startswith('-') != reverse
+            name = field.lstrip('-')
+            after = Q(**{f'{name}__{"lt" if descending else "gt"}': value})
+            if query is not None:
+                after |= Q(**{name: value}) & query
+            query = after
+        return query
+
+    def decode_position(self, position):
+        try:
+            values = json.loads(position)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if (
+            not isinstance(values, list)
+            or len(values) != len(self.ordering)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def encode_position(self, instance):
+        return json.dumps([
+            str(getattr(instance, field.lstrip('-')))
+            for field in self.ordering
+        ], ensure_ascii=False)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Nothing before the reverse cursor, so the rest of the rows
+            # starts at the first page.
+            return self.encode_cursor(Cursor(0, False, None))
+        return self.encode_cursor(
+            Cursor(0, False, self.encode_position(self.page[-1]))
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return self.encode_cursor(Cursor(0, True, None))
+        return self.encode_cursor(
+            Cursor(0, True, self.encode_position(self.page[0]))
+        )
+
+
+class SwitchablePagination(PageNumberPagination):
+    """
+    Page number pagination with an opt-in keyset mode.
+
+    Keyset mode is selected with the `?pagination=cursor` query param or
+    the `X-Pagination: cursor` header. It skips COUNT(*) and OFFSET, so
+    fetching a page costs the same at any depth. The view has to declare
+    `cursor_ordering` backed by an index.
+    """
+    mode_query_param = 'pagination'
+    mode_header = 'HTTP_X_PAGINATION'
+    cursor_mode = 'cursor'
+    cursor_paginator = None
+
+    def is_cursor_mode(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == self.cursor_mode
+            or request.META.get(self.mode_header) == self.cursor_mode
+            or KeysetPagination.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.is_cursor_mode(request):
+            self.cursor_paginator = KeysetPagination()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -22,9 +22,11 @@ class IsAuthor(permissions.BasePermission):
         return (
             request.user.is_authenticated
             and request.method in ('PATCH', 'PUT', 'DELETE')
-            and view.get_object().author == request.user
         )
 
+    def has_object_permission(self, request, view, obj):
+        return obj.author_id == request.user.pk
+
 
 class IsAuthenticatedAndNoModify(permissions.BasePermission):
     def has_permission(self, request, view):
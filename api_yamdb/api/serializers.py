@@ -6,7 +6,6 @@ from rest_framework import serializers
 from reviews.models import Category, Comment, User, Genre, Review, Title
 
 from .mixins import AuthorMixin
-from .validators import validate_review_unique
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -28,8 +27,8 @@ class TitleReadSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = ('id', 'name', 'year', 'rating', 'description', 'genre',
-                  'category')
+        fields = ('id', 'name', 'year', 'rating', 'review_count',
+                  'description', 'genre', 'category')
 
 
 class TitleWriteSerializer(serializers.ModelSerializer):
@@ -57,15 +56,7 @@ class ReviewSerializer(serializers.ModelSerializer, AuthorMixin):
     class Meta:
         model = Review
         fields = '__all__'
-
-    def validate(self, data):
-        request = self.context['request']
-        if request.method == 'POST':
-            validate_review_unique(
-                self.context['view'].get_title(),
-                request.user
-            )
-        return data
+        read_only_fields = ('comment_count',)
 
 
 class CommentSerializer(serializers.ModelSerializer, AuthorMixin):
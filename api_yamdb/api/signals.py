@@ -0,0 +1,66 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.rating import counters_refreshed
+from users.models import User
+
+from .authentication import get_user_generation, user_cache
+from .cache import (category_cache, genre_cache, get_title_generation,
+                    title_facet_cache, title_generation)
+
+
+@receiver((post_save, post_delete), sender=Category)
+def invalidate_category_cache(**kwargs):
+    transaction.on_commit(category_cache.invalidate)
+
+
+@receiver((post_save, post_delete), sender=Genre)
+def invalidate_genre_cache(**kwargs):
+    transaction.on_commit(genre_cache.invalidate)
+
+
+@receiver((post_save, post_delete), sender=Title)
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_title_generation(**kwargs):
+    transaction.on_commit(title_generation.bump)
+
+
+@receiver((post_save, post_delete), sender=Review)
+def bump_review_generation(instance, **kwargs):
+    transaction.on_commit(get_title_generation(instance.title_id).bump)
+
+
+@receiver((post_save, post_delete), sender=Comment)
+def bump_comment_generation(instance, **kwargs):
+    # Reviews carry comment counts. The review is cached when the
+    # comment was written through the API.
+    if Comment.review.is_cached(instance):
+        title_id = instance.review.title_id
+    else:
+        title_id = Review.objects.filter(pk=instance.review_id).values_list(
+            'title_id', flat=True
+        ).first()
+    if title_id is not None:
+        transaction.on_commit(get_title_generation(title_id).bump)
+
+
+@receiver((post_save, post_delete), sender=Title)
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_facet_cache(**kwargs):
+    transaction.on_commit(title_facet_cache.invalidate)
+
+
+@receiver(counters_refreshed)
+def bump_title_generation_on_refresh(**kwargs):
+    title_generation.bump()
+
+
+@receiver((post_save, post_delete), sender=User)
+def invalidate_user_cache(instance, **kwargs):
+    def invalidate():
+        user_cache.invalidate(instance.pk)
+        get_user_generation(instance.pk).bump()
+
+    transaction.on_commit(invalidate)
@@ -0,0 +1,96 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket of the scope's rate per key.
+
+    A bucket holds up to num_requests tokens and refills at
+    num_requests / duration tokens per second, so bursts are allowed
+    while the long-term rate is capped. Each key costs one cache entry
+    of (tokens, updated) in THROTTLE_CACHE_ALIAS, which has to be shared
+    by all processes. Reads and writes are not atomic, concurrent
+    requests of one key may overshoot the budget by a few requests.
+    """
+
+    @property
+    def cache(self):
+        return caches[settings.THROTTLE_CACHE_ALIAS]
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        now = self.timer()
+        refill = self.num_requests / self.duration
+        tokens, updated = self.cache.get(
+            self.key, (self.num_requests, now)
+        )
+        tokens = min(self.num_requests, tokens + (now - updated) * refill)
+        if tokens < 1:
+            self.wait_seconds = (1 - tokens) / refill
+            return False
+        self.cache.set(self.key, (tokens - 1, now), self.duration)
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class ClientIPThrottle(TokenBucketThrottle):
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope, 'ident': self.get_ident(request)
+        }
+
+
+class SignupThrottle(ClientIPThrottle):
+    """Signups per client IP."""
+    scope = 'signup'
+
+
+class TokenThrottle(ClientIPThrottle):
+    """Token requests per client IP."""
+    scope = 'token'
+
+
+class TokenUsernameThrottle(TokenBucketThrottle):
+    """
+    Token requests per username, whatever IP they come from.
+
+    Caps guesses at the confirmation code of one user however many IPs
+    they come from. Someone else can use up the bucket, but wrong codes
+    already drop the code after CONFIRMATION_CODE_MAX_FAILURES attempts,
+    and the bucket refills within minutes.
+    """
+    scope = 'token_username'
+
+    def get_cache_key(self, request, view):
+        username = request.data.get('username')
+        if not isinstance(username, str) or not username:
+            return None
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': hashlib.md5(username.encode()).hexdigest(),
+        }
+
+
+class WriteThrottle(TokenBucketThrottle):
+    """Unsafe requests per authenticated user."""
+    scope = 'write'
+
+    def get_cache_key(self, request, view):
+        if request.method in SAFE_METHODS:
+            return None
+        if not request.user or not request.user.is_authenticated:
+            return None
+        return self.cache_format % {
+            'scope': self.scope, 'ident': request.user.pk
+        }
@@ -1,8 +1,11 @@
-import random
+from itertools import islice
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
-from django.db import transaction
+from django.core.exceptions import PermissionDenied
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Prefetch, prefetch_related_objects
+from django.http import HttpResponse, StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import action
@@ -11,15 +14,25 @@ from rest_framework.filters import SearchFilter
 from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
-from rest_framework_simplejwt.tokens import RefreshToken
 
 from api.filters import TitleFilter
-from reviews.models import Category, Genre, Review, Title
-from users.models import ConfirmationCode, User
-
-from .mixins import CreateListDestroyViewSet
+from reviews.models import Category, Genre, Review, Title, TitleGenre
+from users.codes import get_code_store
+from users.models import User
+from users.outbox import queue_mail
+
+from .authentication import get_tokens_for_user
+from .cache import (category_cache, genre_cache, get_title_generation,
+                    title_facet_cache, title_generation)
+from .metrics import CONTENT_TYPE, render_metrics
+from .mixins import (ConditionalListMixin, ConditionalRetrieveMixin,
+                     CreateListDestroyViewSet, MemoizedObjectMixin,
+                     NestedParentMixin)
+from .pagination import SwitchablePagination
 from .permissions import (IsAdmin, IsAuthenticatedAndNoModify, IsModerator,
                           IsAuthor, IsReadOnly, IsSuperuser)
 from .serializers import (CategorySerializer, CommentSerializer,
@@ -27,6 +40,7 @@ from .serializers import (CategorySerializer, CommentSerializer,
                           ReviewSerializer, SignupSerializer,
                           TitleReadSerializer, TitleWriteSerializer,
                           UserSerializer)
+from .throttling import SignupThrottle, TokenThrottle, TokenUsernameThrottle
 
 User = get_user_model()
 
@@ -37,6 +51,7 @@ class CategoryViewSet(CreateListDestroyViewSet):
         IsAdmin | IsReadOnly,
     )
     serializer_class = CategorySerializer
+    response_cache = category_cache
     filter_backends = (SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
@@ -48,61 +63,208 @@ class GenreViewSet(CreateListDestroyViewSet):
         IsAdmin | IsReadOnly,
     )
     serializer_class = GenreSerializer
+    response_cache = genre_cache
     filter_backends = (SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
 
 
-class TitleViewSet(ModelViewSet):
+def get_title_version(title_id):
+    try:
+        return Title.objects.filter(pk=title_id).values_list(
+            'version', flat=True
+        ).first()
+    except ValueError:
+        return None
+
+
+class TitleViewSet(ConditionalListMixin, ConditionalRetrieveMixin,
+                   ModelViewSet):
     queryset = Title.objects.all()
     permission_classes = (
         IsAdmin | IsReadOnly,
     )
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
+    pagination_class = SwitchablePagination
+    cursor_ordering = ('name', 'id')
     http_method_names = ('get', 'post', 'patch', 'delete')
 
-    def get_serializer_class(self):
+    export_chunk_size = 1000
+
+    def get_queryset(self):
         if self.action in ('list', 'retrieve'):
+            return Title.objects.select_related('category').prefetch_related(
+                Prefetch('genre', queryset=Genre.objects.only('name', 'slug'))
+            ).only(
+                'name', 'year', 'rating', 'review_count', 'description',
+                'category__name', 'category__slug'
+            )
+        if self.action == 'export':
+            return Title.objects.select_related('category').only(
+                'name', 'year', 'rating', 'review_count', 'description',
+                'category__name', 'category__slug'
+            ).order_by('pk')
+        return super().get_queryset()
+
+    def get_etag_parts(self):
+        catalog = (
+            category_cache.generation.get(),
+            genre_cache.generation.get(),
+        )
+        if self.action == 'retrieve':
+            version = get_title_version(self.kwargs['pk'])
+            return None if version is None else (version, *catalog)
+        return (title_generation.get(), *catalog)
+
+    def get_serializer_class(self):
+        if self.action in ('list', 'retrieve', 'export'):
             return TitleReadSerializer
         return TitleWriteSerializer
 
+    @action(detail=False, methods=['get'], pagination_class=None,
+            permission_classes=(IsAdmin | IsSuperuser,))
+    def export(self, request):
+        """
+        Stream all filtered titles as NDJSON, one title per line.
+
+        Titles are read through a server-side cursor, genres are fetched
+        with one query per chunk of export_chunk_size titles.
+        """
+        queryset = self.filter_queryset(self.get_queryset()).order_by('pk')
+        response = StreamingHttpResponse(
+            self.iter_export(queryset), content_type='application/x-ndjson'
+        )
+        response['Content-Disposition'] = (
+            'attachment; filename="titles.ndjson"'
+        )
+        return response
+
+    def iter_export(self, queryset):
+        titles = queryset.iterator(chunk_size=self.export_chunk_size)
+        encoder = JSONEncoder(ensure_ascii=False)
+        while True:
+            chunk = list(islice(titles, self.export_chunk_size))
+            if not chunk:
+                return
+            prefetch_related_objects(chunk, Prefetch(
+                'genre', queryset=Genre.objects.only('name', 'slug')
+            ))
+            serializer = self.get_serializer(chunk, many=True)
+            yield ''.join(
+                encoder.encode(data) + '\n' for data in serializer.data
+            )
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        key = title_facet_cache.make_key(request)
+        data = title_facet_cache.get(key)
+        if data is None:
+            data = self.get_facets(self.filter_queryset(self.get_queryset()))
+            title_facet_cache.set(key, data)
+        return Response(data)
 
-class ReviewViewSet(ModelViewSet):
+    @staticmethod
+    def get_facets(queryset):
+        titles = Title.objects.filter(
+            pk__in=queryset.order_by().values('pk')
+        ).order_by()
+        categories = titles.values(
+            'category__slug', 'category__name'
+        ).annotate(count=Count('id')).order_by('category__name')
+        genres = TitleGenre.objects.filter(title__in=titles).values(
+            'genre__slug', 'genre__name'
+        ).annotate(count=Count('title', distinct=True)).order_by('genre__name')
+        decades = titles.values(decade=F('year') / 10 * 10).annotate(
+            count=Count('id')
+        ).order_by('decade')
+        return {
+            'count': titles.count(),
+            'category': [
+                {
+                    'slug': row['category__slug'],
+                    'name': row['category__name'],
+                    'count': row['count'],
+                }
+                for row in categories
+            ],
+            'genre': [
+                {
+                    'slug': row['genre__slug'],
+                    'name': row['genre__name'],
+                    'count': row['count'],
+                }
+                for row in genres
+            ],
+            'decade': list(decades),
+        }
+
+
+class ReviewViewSet(ConditionalListMixin, ConditionalRetrieveMixin,
+                    MemoizedObjectMixin, NestedParentMixin, ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = (
         IsAdmin | IsModerator | IsAuthor | IsAuthenticatedAndNoModify
         | IsReadOnly,
     )
+    pagination_class = SwitchablePagination
+    cursor_ordering = ('pub_date', 'id')
     http_method_names = ('get', 'post', 'patch', 'delete')
     title = 'title_id'
+    parent_lookups = {
+        'title': (Title.objects.all(), {'id': title}),
+    }
 
     def get_title(self):
-        return get_object_or_404(Title, id=self.kwargs[self.title])
+        return self.get_parent('title')
+
+    def get_etag_parts(self):
+        title_id = self.kwargs[self.title]
+        version = get_title_version(title_id)
+        if version is None:
+            return None
+        return (version, get_title_generation(title_id).get())
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        return self.get_title().reviews.select_related('author')
 
     def perform_create(self, serializer):
         title = self.get_title()
         author = self.request.user
-        serializer.save(title=title, author=author)
-
-
-class CommentViewSet(ModelViewSet):
+        # The unique_review constraint is the only duplicate check, so
+        # concurrent posts can not both succeed. Other integrity errors
+        # are not duplicates and propagate.
+        try:
+            with transaction.atomic():
+                serializer.save(title=title, author=author)
+        except IntegrityError:
+            if not Review.objects.filter(title=title, author=author).exists():
+                raise
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'You have already reviewed this title.'
+                ]
+            })
+
+
+class CommentViewSet(MemoizedObjectMixin, NestedParentMixin, ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = (
         IsAdmin | IsModerator | IsAuthor | IsAuthenticatedAndNoModify
         | IsReadOnly,
     )
+    pagination_class = SwitchablePagination
+    cursor_ordering = ('-pub_date', 'id')
     http_method_names = ('get', 'post', 'patch', 'delete')
+    parent_lookups = {
+        'review': (
+            Review.objects.all(),
+            {'id': 'review_id', 'title_id': 'title_id'}
+        ),
+    }
 
     def get_review(self):
-        return get_object_or_404(
-            Review,
-            id=self.kwargs['review_id'],
-            title_id=self.kwargs['title_id']
-        )
+        return self.get_parent('review')
 
     def get_queryset(self):
         review = self.get_review()
@@ -132,18 +294,31 @@ class UserViewSet(ModelViewSet):
 
     @action(detail=False, methods=['get'], url_path='me', url_name='me')
     def retrieve_me(self, request):
-        serializer = UserSerializer(request.user)
+        # request.user only has the fields cached by the authentication.
+        serializer = UserSerializer(User.objects.get(pk=request.user.pk))
         return Response(serializer.data)
 
     @retrieve_me.mapping.patch
     def update_me(self, request):
         data = request.data.copy()
         data.pop('role', None)
-        serializer = UserSerializer(request.user, data=data, partial=True)
+        serializer = UserSerializer(
+            User.objects.get(pk=request.user.pk), data=data, partial=True
+        )
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data)
 
+    def perform_update(self, serializer):
+        user = serializer.instance
+        role_changed = (
+            serializer.validated_data.get('role', user.role) != user.role
+        )
+        if role_changed and settings.AUTH_REVOKE_TOKENS_ON_ROLE_CHANGE:
+            serializer.save(token_version=user.token_version + 1)
+        else:
+            serializer.save()
+
     def perform_create(self, serializer):
         if 'role' not in serializer.validated_data:
             serializer.save(role='user')
@@ -155,21 +330,16 @@ class SignupView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = SignupSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [SignupThrottle]
 
     @staticmethod
     def send_confirmation_code(user, email):
-        confirmation_code = str(random.randint(100000, 999999))
-        ConfirmationCode.objects.update_or_create(
-            user=user,
-            defaults={'code': confirmation_code}
-        )
-
-        send_mail(
+        confirmation_code = get_code_store().issue(user)
+        queue_mail(
             'Your confirmation code',
             f'Your confirmation code is {confirmation_code}',
             'from@example.com',
-            [email],
-            fail_silently=False,
+            [email]
         )
 
     @transaction.atomic
@@ -213,6 +383,7 @@ class SignupView(generics.CreateAPIView):
 
 class TokenView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [TokenThrottle, TokenUsernameThrottle]
 
     def post(self, request):
         serializer = ConfirmationCodeSerializer(data=request.data)
@@ -220,9 +391,8 @@ class TokenView(APIView):
         username = serializer.validated_data['username']
         confirmation_code = serializer.validated_data['confirmation_code']
         user = get_object_or_404(User, username=username)
-        code = get_object_or_404(ConfirmationCode, user=user)
-        if code.code == confirmation_code:
-            refresh = RefreshToken.for_user(user)
+        if get_code_store().consume(user, confirmation_code):
+            refresh = get_tokens_for_user(user)
             return Response(
                 {'token': str(refresh.access_token)},
                 status=status.HTTP_200_OK
@@ -231,3 +401,14 @@ class TokenView(APIView):
             {'error': 'Invalid confirmation code'},
             status=status.HTTP_400_BAD_REQUEST
         )
+
+
+def metrics(request):
+    """
+    Request latency histograms in the Prometheus text format.
+
+    Only served to the addresses in settings.METRICS_ALLOWED_IPS.
+    """
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        raise PermissionDenied
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
@@ -0,0 +1,127 @@
+"""
+In-process background jobs.
+
+JobQueue hands jobs to worker threads through a broker. LocalBroker is
+an in-memory stand-in with the publish/consume interface of an external
+broker, so it can be swapped without touching the callers. With
+settings.JOBS_EAGER every job runs right away in the calling thread.
+"""
+import atexit
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class LocalBroker:
+    """Queue of (func, args) messages shared by the worker threads."""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+
+    def publish(self, message):
+        self._queue.put(message)
+
+    def consume(self):
+        return self._queue.get()
+
+    def ack(self):
+        self._queue.task_done()
+
+    def join(self):
+        self._queue.join()
+
+
+class JobQueue:
+    """Runs jobs in settings.JOBS_WORKERS threads started on first use."""
+
+    def __init__(self, broker=None):
+        self.broker = broker or LocalBroker()
+        self._workers = []
+        self._lock = threading.Lock()
+
+    def enqueue(self, func, *args):
+        if settings.JOBS_EAGER:
+            func(*args)
+            return
+        self.start()
+        self.broker.publish((func, args))
+
+    def start(self):
+        with self._lock:
+            while len(self._workers) < settings.JOBS_WORKERS:
+                worker = threading.Thread(
+                    target=self.work,
+                    name=f'job-worker-{len(self._workers) + 1}',
+                    daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+
+    def work(self):
+        while True:
+            func, args = self.broker.consume()
+            try:
+                func(*args)
+            except Exception:
+                logger.exception('Job %s failed.', func.__qualname__)
+            finally:
+                # Connections are per thread, do not keep them open while
+                # the worker waits for the next job.
+                connections.close_all()
+                self.broker.ack()
+
+    def join(self):
+        """Wait until every published job is done."""
+        if self._workers:
+            self.broker.join()
+
+
+class CoalescingBuffer:
+    """
+    Collects keys and passes them to func as one set per job.
+
+    The first key starts a timer of delay_setting seconds; keys added
+    before it fires join the same set, so a burst of changes of one key
+    costs a single call and the delay bounds how stale the data can be.
+    """
+
+    def __init__(self, func, delay_setting, jobs=None):
+        self.func = func
+        self.delay_setting = delay_setting
+        self.jobs = jobs or job_queue
+        self._keys = set()
+        self._timer = None
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def add(self, key):
+        if settings.JOBS_EAGER:
+            self.jobs.enqueue(self.func, {key})
+            return
+        with self._lock:
+            self._keys.add(key)
+            if self._timer is None:
+                self._timer = threading.Timer(
+                    getattr(settings, self.delay_setting), self.flush
+                )
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Hand the collected keys to the job queue right away."""
+        with self._lock:
+            keys, self._keys = self._keys, set()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if keys:
+            self.jobs.enqueue(self.func, keys)
+
+
+job_queue = JobQueue()
+atexit.register(job_queue.join)
@@ -1,3 +1,4 @@
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -30,6 +31,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.QueryStatsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -71,6 +74,83 @@ DATABASES = {
 }
 
 
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+RESPONSE_CACHE_ALIAS = 'default'
+
+RESPONSE_CACHE_TIMEOUT = 60 * 60
+
+CONFIRMATION_CODE_STORE = 'users.codes.CacheCodeStore'
+
+# Signup and token requests may hit different processes, so in
+# production the alias must point to a shared cache.
+CONFIRMATION_CODE_CACHE_ALIAS = 'default'
+
+CONFIRMATION_CODE_TTL = 24 * 60 * 60
+
+# Wrong codes a user may send before the current code is dropped.
+CONFIRMATION_CODE_MAX_FAILURES = 5
+
+
+# Background jobs
+
+# Jobs run in worker threads of the process; eager mode runs them
+# synchronously in the calling thread.
+JOBS_EAGER = False
+
+JOBS_WORKERS = 2
+
+# Seconds title ratings may lag behind their reviews.
+RATING_REFRESH_DELAY = 1.0
+
+
+# Request instrumentation, see api.middleware.QueryStatsMiddleware.
+
+QUERY_STATS_SERVER_TIMING = True
+
+# Share of requests logged with their query statistics.
+QUERY_STATS_SAMPLE_RATE = 0.01
+
+# Requests slower than this many seconds are always logged.
+QUERY_STATS_SLOW_REQUEST = 0.5
+
+# Directory shared by all worker processes for /metrics, e.g. an empty
+# tmpfs directory created before gunicorn starts. Without it every
+# process reports only its own requests.
+METRICS_DIR = os.environ.get('METRICS_DIR')
+
+METRICS_FLUSH_INTERVAL = 1.0
+
+# Client addresses allowed to scrape /metrics, comma separated. The
+# scraper has to reach the app directly, not through the proxy.
+METRICS_ALLOWED_IPS = os.environ.get(
+    'METRICS_ALLOWED_IPS', '127.0.0.1,::1'
+).split(',')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.requests': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -113,12 +193,29 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    # Number of reverse proxies in front of the app. Throttles take the
+    # client IP from X-Forwarded-For only behind that many proxies,
+    # otherwise clients could pick their own IP.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.WriteThrottle',
+    ],
+    # Token bucket size per period, see api.throttling.
+    'DEFAULT_THROTTLE_RATES': {
+        'signup': '20/hour',
+        'token': '60/hour',
+        'token_username': '20/hour',
+        'write': '120/minute',
+    },
 }
 
+# Throttle buckets must be shared by all processes in production.
+THROTTLE_CACHE_ALIAS = 'default'
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -130,4 +227,30 @@ EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
+# Seconds new emails are collected before a batch is sent.
+EMAIL_OUTBOX_DELAY = 0.5
+
+EMAIL_OUTBOX_BATCH_SIZE = 100
+
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+
+# Seconds before the first retry, doubled on every further attempt.
+EMAIL_OUTBOX_RETRY_DELAY = 60
+
+# Seconds sent and failed emails stay in the outbox, see send_emails.
+EMAIL_OUTBOX_RETENTION = 7 * 24 * 60 * 60
+
 AUTH_USER_MODEL = 'users.User'
+
+# Process-local cache of authenticated users, see CachedJWTAuthentication.
+AUTH_USER_CACHE_SIZE = 10000
+
+AUTH_USER_CACHE_TTL = 60
+
+# Holds the generations of cached users, has to be shared by all
+# processes.
+AUTH_USER_CACHE_ALIAS = 'default'
+
+# A role change applies to existing tokens right away. With this set,
+# it also revokes all tokens of the user.
+AUTH_REVOKE_TOKENS_ON_ROLE_CHANGE = False
@@ -2,6 +2,8 @@ from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
 
+from api.views import metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
@@ -11,4 +13,5 @@ urlpatterns = [
         name='redoc'
     ),
     path('api/v1/', include('users.urls')),
+    path('metrics', metrics, name='metrics'),
 ]
@@ -0,0 +1,103 @@
+import csv
+import gzip
+import os
+import time
+
+from django.core.management import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+
+from reviews.management.commands.load_csv import TABLES, get_import_stages
+from reviews.models import (Category, Comment, User, Genre, Review, Title,
+                            TitleGenre)
+
+COLUMNS = {
+    User: ('id', 'username', 'email', 'role', 'bio', 'first_name',
+           'last_name'),
+    Category: ('id', 'name', 'slug'),
+    Genre: ('id', 'name', 'slug'),
+    Title: ('id', 'name', 'year', 'description', 'category'),
+    TitleGenre: ('id', 'title_id', 'genre_id'),
+    Review: ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+    Comment: ('id', 'review_id', 'text', 'author', 'pub_date'),
+}
+
+
+def format_csv_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+class Command(BaseCommand):
+    """
+    Exports the catalog to files via the following command:
+    python manage.py dump_csv --output dump.
+
+    Tables are streamed from the database in chunks, so memory use does
+    not depend on table size. CSV files use the names and columns of
+    load_csv, so a plain CSV dump can be loaded back with
+    python manage.py load_csv --path dump.
+    """
+    help = "Export data to csv or ndjson files."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default='dump',
+            help='Directory for the exported files.'
+        )
+        parser.add_argument(
+            '--format', choices=('csv', 'ndjson'), default='csv'
+        )
+        parser.add_argument(
+            '--gzip', action='store_true',
+            help='Compress every file with gzip.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Number of rows fetched from the database at once.'
+        )
+
+    def handle(self, *args, **options):
+        os.makedirs(options['output'], exist_ok=True)
+        for stage in get_import_stages():
+            for model in stage:
+                self.dump_table(model, options)
+        self.stdout.write(self.style.SUCCESS(
+            f"All tables were successfully exported to {options['output']}."
+        ))
+
+    def open(self, path, options):
+        if options['gzip']:
+            return gzip.open(f'{path}.gz', 'wt', encoding='utf-8', newline='')
+        return open(path, 'w', encoding='utf-8', newline='')
+
+    def dump_table(self, model, options):
+        columns = COLUMNS[model]
+        attnames = [model._meta.get_field(column).attname
+                    for column in columns]
+        rows = model.objects.order_by('pk').values_list(*attnames).iterator(
+            chunk_size=options['chunk_size']
+        )
+        name = os.path.splitext(TABLES[model])[0]
+        path = os.path.join(options['output'], f"{name}.{options['format']}")
+        started = time.monotonic()
+        dumped = 0
+        with self.open(path, options) as file:
+            if options['format'] == 'csv':
+                writer = csv.writer(file)
+                writer.writerow(columns)
+                for row in rows:
+                    writer.writerow(map(format_csv_value, row))
+                    dumped += 1
+            else:
+                encoder = DjangoJSONEncoder(ensure_ascii=False)
+                for row in rows:
+                    file.write(encoder.encode(dict(zip(columns, row))))
+                    file.write('\n')
+                    dumped += 1
+        self.stdout.write(
+            f'{model._meta.verbose_name_plural}: {dumped} rows in '
+            f'{time.monotonic() - started:.2f}s'
+        )
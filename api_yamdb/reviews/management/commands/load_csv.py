@@ -1,46 +1,393 @@
 import csv
+import os
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from graphlib import TopologicalSorter
+from itertools import islice
 
+from django.apps import apps
 from django.conf import settings
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError, call_command
+from django.db import models, transaction
+from django.db.models import F
 
-from reviews.models import Category, Comment, User, Genre, Review, Title
+from reviews.management.csv_utils import (count_lines, find_shards,
+                                          init_worker, iter_batches,
+                                          parse_shard, read_rows)
+from reviews.models import (Category, Comment, User, Genre, Review, Title,
+                            TitleGenre)
 
 TABLES = {
     User: 'users.csv',
     Category: 'category.csv',
     Genre: 'genre.csv',
     Title: 'titles.csv',
+    TitleGenre: 'genre_title.csv',
     Review: 'review.csv',
     Comment: 'comments.csv',
 }
 
+NATURAL_KEYS = {
+    User: 'username',
+    Category: 'slug',
+    Genre: 'slug',
+}
+
+# Rows shown as part of a title, by the column of their parent. Writing
+# them has to bump Title.version, or ETags keep matching stale data.
+TITLE_PARTS = {
+    TitleGenre: 'title_id',
+    Review: 'title_id',
+    Comment: 'review_id',
+}
+
+
+def get_import_stages(tables=TABLES):
+    """
+    Group models into stages: every model is loaded after its FK targets,
+    models of one stage do not depend on each other.
+    """
+    graph = TopologicalSorter({
+        model: {
+            field.related_model for field in model._meta.concrete_fields
+            if field.many_to_one and field.related_model in tables
+        }
+        for model in tables
+    })
+    graph.prepare()
+    order = list(tables)
+    stages = []
+    while graph.is_active():
+        stage = sorted(graph.get_ready(), key=order.index)
+        stages.append(stage)
+        graph.done(*stage)
+    return stages
+
+
+def submit_in_order(pool, jobs, window):
+    """Yield futures of jobs in order, keeping up to window of them run."""
+    jobs = iter(jobs)
+    pending = deque(pool.submit(*job) for job in islice(jobs, window))
+    while pending:
+        future = pending.popleft()
+        for job in islice(jobs, 1):
+            pending.append(pool.submit(*job))
+        yield future
+
+
+@contextmanager
+def keep_auto_now(model):
+    """Let bulk_create store dates from the file instead of now()."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if isinstance(field, models.DateField) and field.auto_now_add
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class IdMaps(dict):
+    """
+    Maps of CSV references to primary keys by model label, built with one
+    query per referenced model. A reference is either a primary key or
+    the natural key of the model (slug or username).
+    """
+
+    def __missing__(self, label):
+        model = apps.get_model(label)
+        natural_key = NATURAL_KEYS.get(model)
+        id_map = {}
+        if natural_key:
+            for pk, key in model.objects.values_list(
+                'pk', natural_key
+            ).iterator():
+                id_map[str(pk)] = id_map[key] = pk
+        else:
+            for pk in model.objects.values_list('pk', flat=True).iterator():
+                id_map[str(pk)] = pk
+        self[label] = id_map
+        return id_map
+
+
+class Progress:
+    """Reports rows/s and ETA of a table at most every interval seconds."""
+
+    def __init__(self, command, model, interval):
+        self.command = command
+        self.model = model
+        self.interval = interval
+        self.started = self.reported = time.monotonic()
+        self.loaded = 0
+
+    def update(self, rows, done):
+        self.loaded += rows
+        now = time.monotonic()
+        if now - self.reported >= self.interval:
+            self.reported = now
+            self.report(now - self.started, done)
+
+    def finish(self):
+        self.report(time.monotonic() - self.started, 1)
+
+    def report(self, elapsed, done):
+        rate = self.loaded / elapsed if elapsed else 0
+        eta = elapsed * (1 - done) / done if done else 0
+        self.command.stdout.write(
+            f'{self.model._meta.verbose_name_plural}: {self.loaded} rows, '
+            f'{rate:.0f} rows/s, {done:.0%} done, ETA {eta:.1f}s'
+        )
+
 
 class Command(BaseCommand):
     """
     Imports data from csv files to database via the following command:
     python manage.py load_csv.
 
-    To update the database:
-    1) Remove db.sqlite3
-    2) Make migrations (python manage.py migrate).
+    Tables are loaded in dependency order, FK columns are resolved through
+    in-memory id maps. Every file is streamed in batches of --batch-size
+    rows inside one transaction per table, so memory use does not depend
+    on file size.
 
-    A new empty database will appear.
+    With --workers N, tables of one dependency stage are parsed together
+    in a pool of N processes, and large files are split into shards of
+    about --shard-size bytes. Rows are still inserted in file order.
+
+    To refresh an existing database run the command with --upsert: rows
+    are matched by id and compared with the stored ones, only new and
+    changed rows are written, batches without changes cost one SELECT.
+    Titles whose genres, reviews or comments were written get a new
+    version.
     """
     help = "Import data from csv files."
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=os.path.join(settings.BASE_DIR, 'static', 'data'),
+            help='Directory with the csv files.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of rows inserted per query.'
+        )
+        parser.add_argument(
+            '--progress-interval', type=float, default=1.0,
+            help='Seconds between progress reports.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Number of processes parsing CSV files.'
+        )
+        parser.add_argument(
+            '--shard-size', type=int, default=8 * 1024 * 1024,
+            help='Approximate size of a file shard in bytes.'
+        )
+        parser.add_argument(
+            '--upsert', action='store_true',
+            help='Update changed rows of an existing database.'
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.counts = defaultdict(Counter)
+        # Parent ids of written TITLE_PARTS rows by parent model.
+        self.touched = defaultdict(set)
+        id_maps = IdMaps()
+        timings = []
         try:
-            for model, filename in TABLES.items():
-                with open(
-                    f'{settings.BASE_DIR}/static/data/{filename}',
-                    'r',
-                    encoding='utf-8'
-                ) as csv_file:
-                    reader = csv.DictReader(csv_file)
-                    model.objects.bulk_create(model(**data) for data in reader)
-            self.stdout.write(self.style.SUCCESS(
-                'Data from all CSV files was successfully imported into '
-                'database.'
-            ))
+            for stage in get_import_stages():
+                started = time.monotonic()
+                if options['workers'] > 1:
+                    self.load_stage_parallel(stage, id_maps)
+                else:
+                    for model in stage:
+                        self.load_table(model, id_maps)
+                timings.append((stage, time.monotonic() - started))
+            self.bump_title_versions()
+            call_command('rebuild_counters', stdout=self.stdout)
+            call_command('rebuild_search_index', stdout=self.stdout)
         except FileNotFoundError as e:
             self.stdout.write(self.style.ERROR(e))
+            return
+        except ValueError as e:
+            raise CommandError(e)
+        for number, (stage, elapsed) in enumerate(timings, 1):
+            tables = ', '.join(
+                str(model._meta.verbose_name_plural) for model in stage
+            )
+            self.stdout.write(f'Stage {number} ({tables}): {elapsed:.2f}s')
+        for model, counts in self.counts.items():
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: '
+                f"{counts['inserted']} inserted, {counts['updated']} updated, "
+                f"{counts['unchanged']} unchanged"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            'Data from all CSV files was successfully imported into '
+            'database.'
+        ))
+
+    def get_path(self, model):
+        return os.path.join(self.options['path'], TABLES[model])
+
+    @staticmethod
+    def read_header(model, path):
+        """Return attnames and referenced model labels of CSV columns."""
+        with open(path, 'r', encoding='utf-8', newline='') as csv_file:
+            columns = next(csv.reader(csv_file))
+        fields = [model._meta.get_field(column) for column in columns]
+        return (
+            [field.attname for field in fields],
+            [
+                field.related_model._meta.label if field.many_to_one
+                else None
+                for field in fields
+            ]
+        )
+
+    def insert(self, model, attnames, rows):
+        batch_size = self.options['batch_size']
+        for batch in iter_batches(iter(rows), batch_size):
+            if self.options['upsert']:
+                self.upsert(model, attnames, batch)
+                continue
+            model.objects.bulk_create(
+                [model(**dict(zip(attnames, row))) for row in batch],
+                batch_size=batch_size
+            )
+            self.touch(model, attnames, batch)
+            self.counts[model]['inserted'] += len(batch)
+
+    def touch(self, model, attnames, rows):
+        """Remember parents of written rows which are part of a title."""
+        attname = TITLE_PARTS.get(model)
+        if attname is None or attname not in attnames:
+            return
+        field = model._meta.get_field(attname)
+        index = attnames.index(attname)
+        self.touched[field.related_model].update(
+            field.to_python(row[index]) for row in rows
+            if row[index] is not None
+        )
+
+    def bump_title_versions(self):
+        """Bump versions of titles with written genres, reviews or comments."""
+        batch_size = self.options['batch_size']
+        reviews = self.touched.pop(Review, set())
+        titles = self.touched.pop(Title, set())
+        for batch in iter_batches(iter(sorted(reviews)), batch_size):
+            titles.update(Review.objects.filter(pk__in=batch).values_list(
+                'title_id', flat=True
+            ))
+        with transaction.atomic():
+            for batch in iter_batches(iter(sorted(titles)), batch_size):
+                Title.objects.filter(pk__in=batch).update(
+                    version=F('version') + 1
+                )
+
+    def upsert(self, model, attnames, rows):
+        """Write only rows which are missing or differ from stored ones."""
+        fields = [model._meta.get_field(attname) for attname in attnames]
+        pk_index = attnames.index(model._meta.pk.attname)
+        rows = [
+            [field.to_python(value) for field, value in zip(fields, row)]
+            for row in rows
+        ]
+        stored = {
+            stored_row[pk_index]: list(stored_row)
+            for stored_row in model.objects.filter(
+                pk__in=[row[pk_index] for row in rows]
+            ).values_list(*attnames)
+        }
+        new, changed, written = [], [], []
+        for row in rows:
+            stored_row = stored.get(row[pk_index])
+            if stored_row == row:
+                continue
+            instance = model(**dict(zip(attnames, row)))
+            if stored_row is None:
+                new.append(instance)
+            else:
+                changed.append(instance)
+                # A moved row changes its old parent as well.
+                written.append(stored_row)
+            written.append(row)
+        self.touch(model, attnames, written)
+        counts = self.counts[model]
+        counts['unchanged'] += len(rows) - len(new) - len(changed)
+        if new:
+            model.objects.bulk_create(new)
+            counts['inserted'] += len(new)
+        if changed:
+            update_fields = [
+                field.attname for field in fields if not field.primary_key
+            ]
+            if any(field.name == 'version' for field in model._meta.fields):
+                update_fields.append('version')
+                for instance in changed:
+                    instance.version = F('version') + 1
+            model.objects.bulk_update(changed, update_fields)
+            counts['updated'] += len(changed)
+
+    def load_table(self, model, id_maps):
+        path = self.get_path(model)
+        attnames, references = self.read_header(model, path)
+        total_lines = count_lines(path)
+        progress = Progress(self, model, self.options['progress_interval'])
+        with open(path, 'r', encoding='utf-8', newline='') as csv_file:
+            reader = csv.reader(csv_file)
+            next(reader)
+            rows = read_rows(reader, references, id_maps, path)
+            with transaction.atomic(), keep_auto_now(model):
+                for batch in iter_batches(rows, self.options['batch_size']):
+                    self.insert(model, attnames, batch)
+                    progress.update(
+                        len(batch), reader.line_num / max(total_lines, 1)
+                    )
+        progress.finish()
+
+    def load_stage_parallel(self, stage, id_maps):
+        headers = {model: self.read_header(model, self.get_path(model))
+                   for model in stage}
+        shards = {
+            model: find_shards(self.get_path(model),
+                               self.options['shard_size'])
+            for model in stage
+        }
+        labels = {
+            label for _, references in headers.values()
+            for label in references if label
+        }
+        workers = self.options['workers']
+        with ProcessPoolExecutor(
+            workers,
+            initializer=init_worker,
+            initargs=({label: id_maps[label] for label in labels},)
+        ) as pool:
+            results = submit_in_order(
+                pool,
+                (
+                    (parse_shard, self.get_path(model), *shard,
+                     headers[model][1])
+                    for model in stage for shard in shards[model]
+                ),
+                workers * 2
+            )
+            for model in stage:
+                size = os.path.getsize(self.get_path(model))
+                progress = Progress(
+                    self, model, self.options['progress_interval']
+                )
+                with transaction.atomic(), keep_auto_now(model):
+                    for _, end, _ in shards[model]:
+                        rows = next(results).result()
+                        self.insert(model, headers[model][0], rows)
+                        progress.update(len(rows), end / size)
+                progress.finish()
@@ -0,0 +1,79 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from reviews.models import Comment, Review, Title
+
+
+class Command(BaseCommand):
+    """
+    Recalculates denormalized review counters of titles and comment
+    counters of reviews via the following command:
+    python manage.py rebuild_counters.
+
+    Use it after bulk imports or raw SQL edits that bypass save() and
+    delete() of reviews and comments. Every title whose counters or whose
+    reviews' comment counters change gets a new version.
+    """
+    help = "Rebuild title and review counters and ratings."
+
+    batch_size = 1000
+
+    def handle(self, *args, **kwargs):
+        titles = self.rebuild_titles()
+        reviews = self.rebuild_reviews()
+        self.stdout.write(self.style.SUCCESS(
+            f'Counters rebuilt, {titles} titles and {reviews} reviews '
+            'updated.'
+        ))
+
+    def rebuild_titles(self):
+        totals = {
+            row['title']: (row['review_count'], row['score_sum'])
+            for row in Review.objects.order_by().values('title').annotate(
+                review_count=Count('id'),
+                score_sum=Sum('score')
+            )
+        }
+        changed = []
+        for title in Title.objects.only(*Title.COUNTER_FIELDS).iterator():
+            review_count, score_sum = totals.get(title.pk, (0, 0))
+            rating = score_sum / review_count if review_count else None
+            if (title.review_count, title.score_sum, title.rating) != (
+                review_count, score_sum, rating
+            ):
+                title.review_count = review_count
+                title.score_sum = score_sum
+                title.rating = rating
+                title.version = F('version') + 1
+                changed.append(title)
+        with transaction.atomic():
+            Title.objects.bulk_update(
+                changed, (*Title.COUNTER_FIELDS, 'version'),
+                batch_size=self.batch_size
+            )
+        return len(changed)
+
+    def rebuild_reviews(self):
+        totals = dict(
+            Comment.objects.order_by().values('review').annotate(
+                comment_count=Count('id')
+            ).values_list('review', 'comment_count')
+        )
+        changed = []
+        reviews = Review.objects.only('title', *Review.COUNTER_FIELDS)
+        for review in reviews.iterator():
+            comment_count = totals.get(review.pk, 0)
+            if review.comment_count != comment_count:
+                review.comment_count = comment_count
+                changed.append(review)
+        title_ids = sorted({review.title_id for review in changed})
+        with transaction.atomic():
+            Review.objects.bulk_update(
+                changed, Review.COUNTER_FIELDS, batch_size=self.batch_size
+            )
+            for start in range(0, len(title_ids), self.batch_size):
+                Title.objects.filter(
+                    pk__in=title_ids[start:start + self.batch_size]
+                ).update(version=F('version') + 1)
+        return len(changed)
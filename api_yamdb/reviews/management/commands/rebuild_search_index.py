@@ -0,0 +1,20 @@
+from django.core.management import BaseCommand
+
+from reviews.search import get_backend
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the full-text search index of titles via the following
+    command:
+    python manage.py rebuild_search_index.
+
+    Run it after imports that bypass model signals, e.g. load_csv.
+    """
+    help = "Rebuild the full-text search index of titles."
+
+    def handle(self, *args, **kwargs):
+        get_backend().rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            'Search index of titles was successfully rebuilt.'
+        ))
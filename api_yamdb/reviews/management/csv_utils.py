@@ -0,0 +1,93 @@
+"""
+CSV helpers of load_csv.
+
+The module does not touch Django, so its functions can run in worker
+processes of any multiprocessing start method.
+"""
+import csv
+import io
+from itertools import islice
+
+_id_maps = {}
+
+
+def count_lines(path, chunk_size=1024 * 1024):
+    """Count lines without decoding or keeping the file in memory."""
+    lines = 0
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            lines += chunk.count(b'\n')
+    return lines
+
+
+def iter_batches(rows, batch_size):
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def find_shards(path, shard_size):
+    """
+    Split data rows of a CSV file into (start, end, first_line) byte
+    ranges of about shard_size bytes.
+
+    Quoted values may contain newlines, so a shard only ends on a newline
+    preceded by an even number of quote characters.
+    """
+    shards = []
+    with open(path, 'rb') as file:
+        start = position = len(file.readline())
+        first_line = line_num = 2
+        quotes = 0
+        for line in file:
+            position += len(line)
+            quotes += line.count(b'"')
+            line_num += 1
+            if quotes % 2 == 0 and position - start >= shard_size:
+                shards.append((start, position, first_line))
+                start, first_line = position, line_num
+    if position > start:
+        shards.append((start, position, first_line))
+    return shards
+
+
+def read_rows(reader, references, id_maps, path, line_offset=0):
+    """
+    Yield CSV rows with FK references replaced by primary keys.
+
+    references holds, per column, the label of the referenced model or
+    None for plain values.
+    """
+    for values in reader:
+        row = []
+        for value, reference in zip(values, references):
+            if reference is not None:
+                if value == '':
+                    value = None
+                else:
+                    try:
+                        value = id_maps[reference][value]
+                    except KeyError:
+                        raise ValueError(
+                            f'{path}:{line_offset + reader.line_num}: '
+                            f'unknown {reference} reference {value!r}.'
+                        )
+            row.append(value)
+        yield row
+
+
+def init_worker(id_maps):
+    global _id_maps
+    _id_maps = id_maps
+
+
+def parse_shard(path, start, end, first_line, references):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start).decode('utf-8')
+    reader = csv.reader(io.StringIO(data, newline=''))
+    return list(
+        read_rows(reader, references, _id_maps, path, first_line - 1)
+    )
@@ -0,0 +1,40 @@
+# Generated by Django 3.2.25 on 2026-10-17 09:15
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_counters(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    totals = Review.objects.order_by().values('title').annotate(
+        review_count=Count('id'),
+        score_sum=Sum('score')
+    )
+    for row in totals:
+        Title.objects.filter(pk=row['title']).update(
+            review_count=row['review_count'],
+            score_sum=row['score_sum'],
+            rating=row['score_sum'] / row['review_count']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Number of reviews'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, verbose_name='Sum of review scores'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-17 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='version',
+            field=models.PositiveIntegerField(default=0, help_text='Bumped on every change of the title or its reviews.', verbose_name='Version'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 3.2.25 on 2026-10-17 13:05
+
+from django.db import migrations
+
+# The DDL is kept here rather than imported from reviews.search, so this
+# migration does not change along with the app code.
+CREATE_INDEX = {
+    'sqlite': (
+        'CREATE VIRTUAL TABLE IF NOT EXISTS reviews_title_fts USING fts5('
+        "name, description, tokenize='unicode61 remove_diacritics 2')",
+        'INSERT INTO reviews_title_fts (rowid, name, description) '
+        'SELECT id, name, description FROM reviews_title',
+    ),
+    'postgresql': (
+        'CREATE INDEX IF NOT EXISTS reviews_title_search_idx '
+        'ON reviews_title USING GIN '
+        "((to_tsvector('simple', name || ' ' || description)))",
+    ),
+}
+
+DROP_INDEX = {
+    'sqlite': ('DROP TABLE IF EXISTS reviews_title_fts',),
+    'postgresql': ('DROP INDEX IF EXISTS reviews_title_search_idx',),
+}
+
+
+def create_search_index(apps, schema_editor):
+    for sql in CREATE_INDEX.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    for sql in DROP_INDEX.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_title_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.25 on 2026-10-17 14:40
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_comment_count(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Comment = apps.get_model('reviews', 'Comment')
+    totals = Comment.objects.order_by().values('review').annotate(
+        comment_count=Count('id')
+    )
+    for row in totals:
+        Review.objects.filter(pk=row['review']).update(
+            comment_count=row['comment_count']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_title_year_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Number of comments'),
+        ),
+        migrations.RunPython(fill_comment_count, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,7 @@
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.expressions import Combinable
 
 from users.models import User
 
@@ -49,6 +51,7 @@ class Title(models.Model):
     )
     year = models.IntegerField(
         verbose_name='Year',
+        db_index=True,
     )
     category = models.ForeignKey(
         Category,
@@ -73,15 +76,84 @@ class Title(models.Model):
         verbose_name='Rating',
         null=True
     )
+    review_count = models.PositiveIntegerField(
+        verbose_name='Number of reviews',
+        default=0
+    )
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Sum of review scores',
+        default=0
+    )
+    version = models.PositiveIntegerField(
+        verbose_name='Version',
+        default=0,
+        help_text='Bumped on every change of the title or its reviews.'
+    )
+
+    COUNTER_FIELDS = ('rating', 'review_count', 'score_sum')
 
     class Meta:
         ordering = ('name',)
+        indexes = (
+            models.Index(fields=('name', 'id'), name='title_name_id_idx'),
+        )
         verbose_name = 'Title'
         verbose_name_plural = 'Titles'
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # Counters are only ever written through Title.refresh_counters(),
+        # so a regular save must not overwrite them with stale values.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            self.version = F('version') + 1
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+        if isinstance(self.version, Combinable):
+            self.refresh_from_db(fields=('version',))
+
+    @classmethod
+    def refresh_counters(cls, title_ids):
+        """
+        Recount reviews of titles with one grouped query and write the
+        counters, rating and a new version of the titles that changed.
+
+        Counters are recomputed from the reviews table, so a lost or
+        repeated job never leaves them wrong. Return the changed ids.
+        """
+        totals = {
+            row['title']: (row['review_count'], row['score_sum'])
+            for row in Review.objects.filter(
+                title__in=title_ids
+            ).order_by().values('title').annotate(
+                review_count=Count('id'),
+                score_sum=Sum('score')
+            )
+        }
+        changed = set()
+        titles = cls.objects.filter(pk__in=title_ids).order_by().only(
+            *cls.COUNTER_FIELDS
+        )
+        for title in titles:
+            review_count, score_sum = totals.get(title.pk, (0, 0))
+            rating = score_sum / review_count if review_count else None
+            if (title.review_count, title.score_sum, title.rating) != (
+                review_count, score_sum, rating
+            ):
+                cls.objects.filter(pk=title.pk).update(
+                    version=F('version') + 1,
+                    review_count=review_count,
+                    score_sum=score_sum,
+                    rating=rating
+                )
+                changed.add(title.pk)
+        return changed
+
 
 class TitleGenre(models.Model):
     """Model connecting genres and titles."""
@@ -137,6 +209,12 @@ class Review(models.Model):
         verbose_name='date published',
         auto_now_add=True,
     )
+    comment_count = models.PositiveIntegerField(
+        verbose_name='Number of comments',
+        default=0
+    )
+
+    COUNTER_FIELDS = ('comment_count',)
 
     class Meta:
         verbose_name = 'Review'
@@ -146,25 +224,32 @@ class Review(models.Model):
                 fields=('title', 'author', ),
                 name='unique_review'
             )]
+        indexes = (
+            models.Index(
+                fields=('title', 'pub_date', 'id'),
+                name='review_title_pub_date_idx'
+            ),
+        )
         ordering = ('pub_date',)
 
     def __str__(self):
         return self.text
 
-    def update_title_rating(self):
-        rating = self.title.reviews.aggregate(
-            models.Avg('score')
-        )['score__avg']
-        self.title.rating = rating
-        self.title.save()
-
     def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COUNTER_FIELDS
+            ]
         super().save(*args, **kwargs)
-        self.update_title_rating()
 
-    def delete(self, *args, **kwargs):
-        super().delete(*args, **kwargs)
-        self.update_title_rating()
+    @classmethod
+    def change_comment_count(cls, review_id, delta):
+        """Atomically shift the comment counter."""
+        cls.objects.filter(pk=review_id).update(
+            comment_count=F('comment_count') + delta
+        )
 
 
 class Comment(models.Model):
@@ -191,8 +276,20 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('review', '-pub_date', 'id'),
+                name='comment_review_pub_date_idx'
+            ),
+        )
         verbose_name = 'Comment'
         verbose_name_plural = 'Comments'
 
     def __str__(self):
         return self.text
+
+    def save(self, *args, **kwargs):
+        # The post_save receiver shifts the comment counter of the review
+        # in the same transaction. delete() is atomic already.
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
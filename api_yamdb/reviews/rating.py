@@ -0,0 +1,23 @@
+"""Deferred recount of reviews and ratings of titles."""
+from django.apps import apps
+from django.db import transaction
+from django.dispatch import Signal
+
+from api_yamdb.jobs import CoalescingBuffer
+
+# Sent with the set of title_ids whose counters were changed.
+counters_refreshed = Signal()
+
+
+def refresh_titles(title_ids):
+    Title = apps.get_model('reviews', 'Title')
+    changed = Title.refresh_counters(title_ids)
+    counters_refreshed.send(sender=Title, title_ids=changed)
+
+
+title_refresh = CoalescingBuffer(refresh_titles, 'RATING_REFRESH_DELAY')
+
+
+def schedule_title_refresh(title_id):
+    """Refresh counters of the title after the current transaction."""
+    transaction.on_commit(lambda: title_refresh.add(title_id))
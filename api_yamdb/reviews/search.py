@@ -0,0 +1,145 @@
+import re
+
+from django.db import connection
+from django.db.models import (BooleanField, F, FloatField, Func, TextField,
+                              Value)
+from django.db.models.expressions import RawSQL
+
+TITLE_TABLE = 'reviews_title'
+FTS_TABLE = f'{TITLE_TABLE}_fts'
+
+
+# Search is built from expressions rather than .extra(), so the column
+# references follow the table alias when a searched queryset is used as
+# a subquery, e.g. by the title facets.
+
+class FTSRank(Func):
+    """FTS5 rank of the title with the id given first for a MATCH query."""
+    template = (
+        f'(SELECT rank FROM {FTS_TABLE} '
+        f'WHERE {FTS_TABLE}.rowid = %(expressions)s)'
+    )
+    arg_joiner = f' AND {FTS_TABLE} MATCH '
+    output_field = FloatField()
+
+
+class SearchDocument(Func):
+    """tsvector of a title, the expression of the GIN index."""
+    template = "to_tsvector('simple', %(expressions)s)"
+    arg_joiner = " || ' ' || "
+    output_field = TextField()
+
+    def __init__(self):
+        super().__init__(F('name'), F('description'))
+
+
+class SearchQuery(Func):
+    template = "to_tsquery('simple', %(expressions)s)"
+    output_field = TextField()
+
+
+class SearchMatch(Func):
+    template = '%(expressions)s'
+    arg_joiner = ' @@ '
+    output_field = BooleanField()
+
+
+def get_terms(text):
+    return re.findall(r'\w+', text.lower())
+
+
+class SearchBackend:
+    """Fallback for databases without full-text search support."""
+
+    def rebuild(self):
+        pass
+
+    def index(self, title):
+        pass
+
+    def remove(self, title_id):
+        pass
+
+    def search(self, queryset, text):
+        for term in get_terms(text):
+            queryset = queryset.filter(name__icontains=term)
+        return queryset
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """FTS5 virtual table kept in sync with titles by model signals."""
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+                f'SELECT id, name, description FROM {TITLE_TABLE}'
+            )
+
+    def index(self, title):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [title.pk]
+            )
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, name, description) '
+                'VALUES (%s, %s, %s)',
+                [title.pk, title.name, title.description]
+            )
+
+    def remove(self, title_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [title_id]
+            )
+
+    def search(self, queryset, text):
+        terms = get_terms(text)
+        if not terms:
+            return queryset.none()
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            (match,)
+        )).annotate(
+            search_rank=FTSRank(F('pk'), Value(match))
+        ).order_by('search_rank')
+
+
+class PostgreSQLSearchBackend(SearchBackend):
+    """
+    GIN expression index over the tsvector of a title.
+
+    The index is maintained by PostgreSQL itself, so there is nothing to
+    sync on save.
+    """
+
+    def search(self, queryset, text):
+        terms = get_terms(text)
+        if not terms:
+            return queryset.none()
+        query = SearchQuery(Value(' & '.join(f'{term}:*' for term in terms)))
+        return queryset.filter(
+            SearchMatch(SearchDocument(), query)
+        ).annotate(
+            search_rank=Func(
+                SearchDocument(), query, function='ts_rank',
+                output_field=FloatField()
+            )
+        ).order_by('-search_rank')
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgreSQLSearchBackend,
+}
+
+
+def get_backend(vendor=None):
+    return BACKENDS.get(vendor or connection.vendor, SearchBackend)()
+
+
+def search_titles(queryset, text):
+    """Filter titles by name and description, best matches first."""
+    return get_backend().search(queryset, text)
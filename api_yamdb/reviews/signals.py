@@ -0,0 +1,37 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Comment, Review, Title
+from .rating import schedule_title_refresh
+from .search import get_backend
+
+
+@receiver(post_save, sender=Title)
+def index_title(instance, raw=False, **kwargs):
+    if not raw:
+        get_backend().index(instance)
+
+
+@receiver(post_delete, sender=Title)
+def unindex_title(instance, **kwargs):
+    get_backend().remove(instance.pk)
+
+
+@receiver((post_save, post_delete), sender=Review)
+def refresh_title_counters(instance, raw=False, **kwargs):
+    # Also sent for reviews deleted by a cascade, e.g. with their author.
+    # Counters, rating and version of the title are recounted by a
+    # background job, the only writer of the hot title row.
+    if not raw:
+        schedule_title_refresh(instance.title_id)
+
+
+@receiver(post_save, sender=Comment)
+def count_comment(instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Review.change_comment_count(instance.review_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_comment(instance, **kwargs):
+    Review.change_comment_count(instance.review_id, -1)
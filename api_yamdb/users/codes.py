@@ -0,0 +1,70 @@
+"""
+Confirmation code stores.
+
+A store issues a code per user and accepts it once within its TTL. A
+code is dropped after CONFIRMATION_CODE_MAX_FAILURES wrong attempts. The
+class is chosen by settings.CONFIRMATION_CODE_STORE.
+"""
+import secrets
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.crypto import constant_time_compare
+from django.utils.module_loading import import_string
+
+
+class CacheCodeStore:
+    """
+    Keeps codes in the CONFIRMATION_CODE_CACHE_ALIAS cache, so expired
+    codes are dropped by the cache itself. Wrong attempts are counted
+    next to the code with the same timeout.
+    """
+
+    def __init__(self):
+        self.cache = caches[settings.CONFIRMATION_CODE_CACHE_ALIAS]
+        self.timeout = settings.CONFIRMATION_CODE_TTL
+        self.max_failures = settings.CONFIRMATION_CODE_MAX_FAILURES
+
+    @staticmethod
+    def make_key(user):
+        return f'confirmation-code:{user.pk}'
+
+    @staticmethod
+    def make_failures_key(user):
+        return f'confirmation-code-fails:{user.pk}'
+
+    def issue(self, user):
+        """Return a new code of the user, replacing the previous one."""
+        code = f'{secrets.randbelow(1000000):06d}'
+        self.cache.set(self.make_key(user), code, self.timeout)
+        self.cache.delete(self.make_failures_key(user))
+        return code
+
+    def consume(self, user, code):
+        """
+        Check the code and invalidate it on success or after
+        max_failures wrong attempts.
+        """
+        key = self.make_key(user)
+        stored = self.cache.get(key)
+        if stored is None:
+            return False
+        failures_key = self.make_failures_key(user)
+        if not constant_time_compare(stored, str(code)):
+            self.cache.add(failures_key, 0, self.timeout)
+            try:
+                failures = self.cache.incr(failures_key)
+            except ValueError:
+                failures = self.max_failures
+            if failures >= self.max_failures:
+                self.cache.delete_many((key, failures_key))
+            return False
+        # Only one of concurrent requests with the same code deletes it.
+        if not self.cache.delete(key):
+            return False
+        self.cache.delete(failures_key)
+        return True
+
+
+def get_code_store():
+    return import_string(settings.CONFIRMATION_CODE_STORE)()
@@ -0,0 +1,22 @@
+from django.core.management import BaseCommand
+
+from users.outbox import purge_outbox, send_pending
+
+
+class Command(BaseCommand):
+    """
+    Sends due emails of the outbox via the following command:
+    python manage.py send_emails.
+
+    Run it from cron to deliver retries when no web process is running.
+    Emails sent or given up more than EMAIL_OUTBOX_RETENTION seconds ago
+    are deleted afterwards.
+    """
+    help = "Send pending emails from the outbox."
+
+    def handle(self, *args, **kwargs):
+        sent = send_pending()
+        purged = purge_outbox()
+        self.stdout.write(self.style.SUCCESS(
+            f'{sent} emails sent, {purged} old emails deleted.'
+        ))
@@ -0,0 +1,20 @@
+# Generated by Django 3.2.25 on 2026-10-17 15:45
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='user',
+            name='confirmation_code',
+        ),
+        migrations.DeleteModel(
+            name='ConfirmationCode',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-17 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_drop_confirmation_code'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='token_version',
+            field=models.PositiveIntegerField(default=0, help_text='Tokens issued for an older version are rejected.', verbose_name='Token version'),
+        ),
+    ]
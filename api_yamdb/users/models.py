@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
+from django.utils import timezone
 
 USER = 'user'
 ADMIN = 'admin'
@@ -66,11 +67,10 @@ class User(AbstractUser):
         max_length=150,
         blank=True
     )
-    confirmation_code = models.CharField(
-        verbose_name='Confirmation code',
-        max_length=255,
-        null=True,
-        blank=False
+    token_version = models.PositiveIntegerField(
+        verbose_name='Token version',
+        default=0,
+        help_text='Tokens issued for an older version are rejected.'
     )
 
     @property
@@ -98,6 +98,53 @@ class User(AbstractUser):
         return self.username
 
 
-class ConfirmationCode(models.Model):
-    user = models.OneToOneField(User, on_delete=models.CASCADE)
-    code = models.CharField(max_length=6)
+class OutgoingEmail(models.Model):
+    """Email waiting in the outbox until a worker sends it."""
+    subject = models.CharField(
+        verbose_name='Subject',
+        max_length=255
+    )
+    body = models.TextField(
+        verbose_name='Body'
+    )
+    from_email = models.EmailField(
+        verbose_name='Sender'
+    )
+    to = models.EmailField(
+        verbose_name='Recipient'
+    )
+    created = models.DateTimeField(
+        verbose_name='Created',
+        auto_now_add=True
+    )
+    sent_at = models.DateTimeField(
+        verbose_name='Sent',
+        null=True,
+        blank=True
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Delivery attempts',
+        default=0
+    )
+    next_attempt_at = models.DateTimeField(
+        verbose_name='Next attempt',
+        default=timezone.now
+    )
+    last_error = models.TextField(
+        verbose_name='Last error',
+        blank=True
+    )
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('sent_at', 'next_attempt_at'),
+                name='outgoing_email_pending_idx'
+            ),
+        )
+        ordering = ('id',)
+        verbose_name = 'Outgoing email'
+        verbose_name_plural = 'Outgoing emails'
+
+    def __str__(self):
+        return f'{self.subject} to {self.to}'
@@ -0,0 +1,161 @@
+"""
+Email outbox.
+
+Requests only store emails with queue_mail(); a background job sends
+them in batches, each over one SMTP connection. Failed emails are
+retried with exponential backoff up to EMAIL_OUTBOX_MAX_ATTEMPTS times.
+
+Bodies carry confirmation codes, so they are cleared as soon as an email
+is sent or has failed for the last time. purge_outbox() deletes those
+rows after EMAIL_OUTBOX_RETENTION seconds.
+"""
+import logging
+import smtplib
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from api_yamdb.jobs import CoalescingBuffer
+
+from .models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+OUTBOX = 'outbox'
+
+_send_lock = threading.Lock()
+
+
+def queue_mail(subject, message, from_email, recipient_list):
+    """Store an email per recipient and send them after commit."""
+    OutgoingEmail.objects.bulk_create(
+        OutgoingEmail(
+            subject=subject, body=message, from_email=from_email, to=to
+        )
+        for to in recipient_list
+    )
+    transaction.on_commit(lambda: outbox_flush.add(OUTBOX))
+
+
+def get_retry_delay(attempts):
+    return timedelta(
+        seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def claim_batch():
+    """
+    Take due emails and move their next attempt into the future, so
+    other workers skip them and a crashed send is retried later.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True).filter(
+                sent_at__isnull=True,
+                next_attempt_at__lte=now,
+                attempts__lt=settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+            )[:settings.EMAIL_OUTBOX_BATCH_SIZE]
+        )
+        for email in emails:
+            email.attempts += 1
+            email.next_attempt_at = now + get_retry_delay(email.attempts)
+        OutgoingEmail.objects.bulk_update(
+            emails, ('attempts', 'next_attempt_at')
+        )
+    return emails
+
+
+def send_batch(emails):
+    """
+    Send emails over one connection and record the outcome.
+
+    Every email is passed to send_messages() on its own, so a rejected
+    recipient does not fail the rest of the batch.
+    """
+    sent = []
+    failed = []
+    try:
+        with get_connection() as connection:
+            for email in emails:
+                try:
+                    connection.send_messages([EmailMessage(
+                        email.subject, email.body, email.from_email,
+                        [email.to]
+                    )])
+                except smtplib.SMTPRecipientsRefused as error:
+                    email.last_error = str(error)
+                    failed.append(email)
+                else:
+                    sent.append(email.pk)
+    except (smtplib.SMTPException, OSError) as error:
+        logger.warning('Outbox batch failed: %s', error)
+        handled = set(sent) | {email.pk for email in failed}
+        for email in emails:
+            if email.pk not in handled:
+                email.last_error = str(error)
+                failed.append(email)
+    OutgoingEmail.objects.filter(pk__in=sent).update(
+        sent_at=timezone.now(), last_error='', body=''
+    )
+    for email in failed:
+        if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            email.body = ''
+    OutgoingEmail.objects.bulk_update(failed, ('last_error', 'body'))
+    return len(sent), failed
+
+
+def send_pending():
+    """Send all due emails, return the number of sent ones."""
+    total = 0
+    retry_at = None
+    with _send_lock:
+        while True:
+            emails = claim_batch()
+            if not emails:
+                break
+            sent, failed = send_batch(emails)
+            total += sent
+            for email in failed:
+                if email.attempts < settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                    retry_at = min(
+                        retry_at or email.next_attempt_at,
+                        email.next_attempt_at
+                    )
+    if retry_at is not None and not settings.JOBS_EAGER:
+        delay = (retry_at - timezone.now()).total_seconds()
+        timer = threading.Timer(max(delay, 0), outbox_flush.add, (OUTBOX,))
+        timer.daemon = True
+        timer.start()
+    return total
+
+
+def purge_outbox():
+    """
+    Delete emails sent or given up more than EMAIL_OUTBOX_RETENTION
+    seconds ago, return their number.
+    """
+    cutoff = timezone.now() - timedelta(
+        seconds=settings.EMAIL_OUTBOX_RETENTION
+    )
+    deleted, _ = OutgoingEmail.objects.filter(
+        Q(sent_at__lt=cutoff)
+        | Q(
+            sent_at__isnull=True,
+            attempts__gte=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+            next_attempt_at__lt=cutoff
+        )
+    ).delete()
+    return deleted
+
+
+def send_outbox(keys):
+    send_pending()
+
+
+outbox_flush = CoalescingBuffer(send_outbox, 'EMAIL_OUTBOX_DELAY')
@@ -0,0 +1,205 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+    COMMENT_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        '{comment_id}/'
+    )
+
+    def get_title(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()
+
+    def test_01_rating_follows_reviews(self, admin_client, user_client,
+                                       moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        assert self.get_title(admin_client, title_id)['rating'] is None, (
+            'Проверьте, что рейтинг произведения без отзывов равен `None`.'
+        )
+
+        create_single_review(admin_client, title_id, 'Отлично', 10)
+        user_review = create_single_review(
+            user_client, title_id, 'Средне', 4
+        ).json()
+        create_single_review(moderator_client, title_id, 'Неплохо', 7)
+        assert self.get_title(admin_client, title_id)['rating'] == 7, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'создании отзыва.'
+        )
+
+        review_url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=user_review['id']
+        )
+        response = admin_client.patch(review_url, data={'score': 10})
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_title(admin_client, title_id)['rating'] == 9, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки в отзыве.'
+        )
+
+        response = admin_client.delete(review_url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_title(admin_client, title_id)['rating'] == 8, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении отзыва.'
+        )
+
+    def test_02_rebuild_counters(self, admin_client, user_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Отлично', 9)
+        create_single_review(user_client, title_id, 'Средне', 4)
+        Title.objects.filter(pk=title_id).update(
+            review_count=0, score_sum=0, rating=None
+        )
+        version = Title.objects.get(pk=title_id).version
+
+        call_command('rebuild_counters')
+
+        title = Title.objects.get(pk=title_id)
+        assert (title.review_count, title.score_sum, title.rating) == (
+            2, 13, 6.5
+        ), (
+            'Проверьте, что команда `rebuild_counters` восстанавливает '
+            'счётчики отзывов и рейтинг произведения.'
+        )
+        assert title.version == version + 1, (
+            'Проверьте, что команда `rebuild_counters` меняет версию '
+            'произведения с изменёнными счётчиками.'
+        )
+
+    def test_03_comment_and_review_counts(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review_id = create_single_review(
+            admin_client, title_id, 'Отлично', 9
+        ).json()['id']
+        review_url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review_id
+        )
+        comments = [
+            create_single_comment(
+                client, title_id, review_id, 'Комментарий'
+            ).json()
+            for client in (admin_client, user_client)
+        ]
+        assert admin_client.get(review_url).json()['comment_count'] == 2, (
+            'Проверьте, что ответ на GET-запрос к отзыву содержит '
+            'количество комментариев `comment_count`.'
+        )
+        assert self.get_title(admin_client, title_id)['review_count'] == 1, (
+            'Проверьте, что ответ на GET-запрос к произведению содержит '
+            'количество отзывов `review_count`.'
+        )
+
+        response = admin_client.patch(
+            review_url, data={'text': 'Хорошо', 'comment_count': 100}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['comment_count'] == 2, (
+            'Проверьте, что поле `comment_count` доступно только для '
+            'чтения и не сбрасывается при изменении отзыва.'
+        )
+
+        response = admin_client.delete(
+            self.COMMENT_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review_id,
+                comment_id=comments[0]['id']
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert admin_client.get(review_url).json()['comment_count'] == 1, (
+            'Проверьте, что количество комментариев уменьшается при '
+            'удалении комментария.'
+        )
+
+    def test_04_rebuild_comment_counts(self, admin_client):
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review_id = create_single_review(
+            admin_client, title_id, 'Отлично', 9
+        ).json()['id']
+        create_single_comment(admin_client, title_id, review_id, 'Первый')
+        create_single_comment(admin_client, title_id, review_id, 'Второй')
+        Review.objects.filter(pk=review_id).update(comment_count=0)
+        version = Title.objects.get(pk=title_id).version
+
+        call_command('rebuild_counters')
+
+        assert Review.objects.get(pk=review_id).comment_count == 2, (
+            'Проверьте, что команда `rebuild_counters` восстанавливает '
+            'счётчики комментариев отзывов.'
+        )
+        assert Title.objects.get(pk=title_id).version == version + 1
+
+    def test_05_author_deleted(self, admin_client, user, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Отлично', 9)
+        create_single_review(user_client, title_id, 'Плохо', 5)
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        title = self.get_title(admin_client, title_id)
+        assert (title['review_count'], title['rating']) == (1, 9), (
+            'Проверьте, что счётчики произведения пересчитываются при '
+            'каскадном удалении отзывов, например вместе с автором.'
+        )
+
+    def test_06_deferred_score(self, admin_client, user_client):
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review_id = create_single_review(
+            user_client, title_id, 'Отлично', 9
+        ).json()['id']
+        review = Review.objects.only('text').get(pk=review_id)
+        review.text = 'Хорошо'
+        review.save()
+        Review.objects.only('title').get(pk=review_id).delete()
+        title = Title.objects.get(pk=title_id)
+        assert (title.review_count, title.score_sum, title.rating) == (
+            0, 0, None
+        ), (
+            'Проверьте, что отзыв с отложенным полем `score` можно '
+            'изменить и удалить.'
+        )
+
+    def test_07_comment_author_deleted(self, admin_client, user,
+                                       user_client):
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review_id = create_single_review(
+            admin_client, title_id, 'Отлично', 9
+        ).json()['id']
+        create_single_comment(admin_client, title_id, review_id, 'Первый')
+        create_single_comment(user_client, title_id, review_id, 'Второй')
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert Review.objects.get(pk=review_id).comment_count == 1, (
+            'Проверьте, что количество комментариев уменьшается при '
+            'каскадном удалении комментариев, например вместе с автором.'
+        )
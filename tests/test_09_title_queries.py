@@ -0,0 +1,41 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_catalog
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    @pytest.mark.parametrize('title_count', (1, 3, 10))
+    def test_01_list_query_count(self, client, django_assert_num_queries,
+                                 title_count):
+        create_catalog(title_count)
+        # COUNT for pagination, the page of titles with categories and
+        # a single prefetch query for genres of the whole page.
+        with django_assert_num_queries(3):
+            response = client.get(self.TITLES_URL)
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert len(results) == title_count
+        assert results[0]['category'] == {'name': 'Фильм', 'slug': 'movie'}
+        assert len(results[0]['genre']) == 2, (
+            f'Проверьте, что ответ на GET-запрос к `{self.TITLES_URL}` '
+            'содержит жанры произведения.'
+        )
+
+    def test_02_retrieve_query_count(self, client, django_assert_num_queries):
+        title = create_catalog(1)[0]
+        # Version lookup for the ETag, the title with its category and
+        # the genres prefetch.
+        with django_assert_num_queries(3):
+            response = client.get(
+                self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=title.id)
+            )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['category']['slug'] == 'movie'
+        assert len(response.json()['genre']) == 2
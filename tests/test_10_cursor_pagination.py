@@ -0,0 +1,134 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_catalog
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def collect_pages(self, client, url, **extra):
+        results = []
+        while url:
+            response = client.get(url, **extra)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что в режиме курсорной пагинации ответ не '
+                'содержит ключ `count`.'
+            )
+            results.extend(data['results'])
+            url = data['next']
+        return results
+
+    def test_01_titles_cursor_query_param(self, client):
+        titles = create_catalog(25)
+        results = self.collect_pages(
+            client, f'{self.TITLES_URL}?pagination=cursor'
+        )
+        assert [title['id'] for title in results] == [
+            title.id for title in sorted(titles, key=lambda t: (t.name, t.id))
+        ], (
+            'Проверьте, что курсорная пагинация возвращает все произведения '
+            'ровно один раз в порядке (name, id).'
+        )
+
+    def test_02_titles_cursor_header(self, client, django_assert_num_queries):
+        create_catalog(12)
+        with django_assert_num_queries(2):
+            response = client.get(self.TITLES_URL, HTTP_X_PAGINATION='cursor')
+        data = response.json()
+        assert len(data['results']) == 10
+        assert data['next'] is not None
+        assert data['previous'] is None
+
+    def test_03_reviews_cursor(self, client, admin, user, moderator):
+        from reviews.models import Review
+
+        title = create_catalog(1)[0]
+        for author in (admin, user, moderator):
+            Review.objects.create(
+                title=title, author=author, text='Текст', score=5
+            )
+        results = self.collect_pages(
+            client,
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+            + '?pagination=cursor'
+        )
+        assert [review['author'] for review in results] == [
+            admin.username, user.username, moderator.username
+        ]
+
+    def test_04_default_page_number(self, client):
+        create_catalog(3)
+        response = client.get(self.TITLES_URL)
+        assert response.json()['count'] == 3, (
+            'Проверьте, что по умолчанию используется постраничная '
+            'пагинация с ключом `count`.'
+        )
+
+    def test_05_equal_names_with_deletes(self, client):
+        from reviews.models import Title
+
+        titles = [Title.objects.create(name='Дубль', year=2000)
+                  for _ in range(15)]
+        data = client.get(f'{self.TITLES_URL}?pagination=cursor').json()
+        first_page = [title['id'] for title in data['results']]
+        # A deleted title before the cursor must not shift the next page.
+        Title.objects.filter(pk=titles[0].pk).delete()
+        results = first_page + [
+            title['id'] for title in self.collect_pages(client, data['next'])
+        ]
+        assert results == [title.id for title in titles], (
+            'Проверьте, что курсор хранит все поля сортировки и страницы '
+            'не пропускают и не повторяют произведения с одинаковым '
+            'названием.'
+        )
+
+    def test_06_previous_pages(self, client):
+        titles = create_catalog(25)
+        url = f'{self.TITLES_URL}?pagination=cursor'
+        while url:
+            data = client.get(url).json()
+            url = data['next']
+        results = []
+        while data['previous']:
+            data = client.get(data['previous']).json()
+            results = [title['id'] for title in data['results']] + results
+        expected = [
+            title.id for title in sorted(titles, key=lambda t: (t.name, t.id))
+        ]
+        assert results == expected[:20]
+
+    def test_07_invalid_cursor(self, client):
+        from base64 import b64encode
+
+        cursor = b64encode(b'p=%5B%22a%22%5D').decode()
+        response = client.get(f'{self.TITLES_URL}?cursor={cursor}')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_08_comments_descending_dates(self, client, user):
+        from reviews.models import Comment, Review
+
+        title = create_catalog(1)[0]
+        review = Review.objects.create(
+            title=title, author=user, text='Текст', score=5
+        )
+        comments = [
+            Comment.objects.create(review=review, author=user, text='Текст')
+            for _ in range(15)
+        ]
+        results = self.collect_pages(
+            client,
+            f'{self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)}'
+            f'{review.id}/comments/?pagination=cursor'
+        )
+        assert [comment['id'] for comment in results] == [
+            comment.id for comment in sorted(
+                comments, key=lambda c: (-c.pub_date.timestamp(), c.id)
+            )
+        ]
@@ -0,0 +1,114 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_categories
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ResponseCache:
+
+    CATEGORY_URL = '/api/v1/categories/'
+    GENRES_URL = '/api/v1/genres/'
+
+    def test_01_category_list_cached(self, client, admin_client,
+                                     django_assert_num_queries):
+        from api.cache import category_cache
+
+        categories = create_categories(admin_client)
+        stats = category_cache.stats()
+
+        response = client.get(self.CATEGORY_URL)
+        assert response['X-Cache'] == 'MISS'
+        with django_assert_num_queries(0):
+            response = client.get(self.CATEGORY_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response['X-Cache'] == 'HIT', (
+            f'Проверьте, что повторный GET-запрос к `{self.CATEGORY_URL}` '
+            'обслуживается из кэша.'
+        )
+        assert response.json()['count'] == len(categories)
+        assert category_cache.stats() == {
+            'hits': stats['hits'] + 1,
+            'misses': stats['misses'] + 1,
+        }
+
+        response = client.get(self.CATEGORY_URL, {'search': 'Фильм'})
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что ключ кэша учитывает параметры запроса.'
+        )
+        assert response.json()['count'] == 1
+
+    def test_02_cache_invalidated_on_write(self, client, admin_client):
+        create_categories(admin_client)
+        client.get(self.CATEGORY_URL)
+
+        admin_client.post(
+            self.CATEGORY_URL, data={'name': 'Музыка', 'slug': 'music'}
+        )
+        response = client.get(self.CATEGORY_URL)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == 3, (
+            'Проверьте, что кэш списка категорий сбрасывается после '
+            'создания категории.'
+        )
+
+        admin_client.delete(f'{self.CATEGORY_URL}music/')
+        response = client.get(self.CATEGORY_URL)
+        assert response.json()['count'] == 2, (
+            'Проверьте, что кэш списка категорий сбрасывается после '
+            'удаления категории.'
+        )
+
+    def test_03_genre_cache_is_separate(self, client, admin_client):
+        client.get(self.GENRES_URL)
+        admin_client.post(
+            self.CATEGORY_URL, data={'name': 'Музыка', 'slug': 'music'}
+        )
+        response = client.get(self.GENRES_URL)
+        assert response['X-Cache'] == 'HIT'
+        admin_client.post(
+            self.GENRES_URL, data={'name': 'Драма', 'slug': 'drama'}
+        )
+        response = client.get(self.GENRES_URL)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == 1
+
+    def test_04_write_during_build_not_cached(self, client, admin_client,
+                                              monkeypatch):
+        from api.cache import category_cache
+        from api.views import CategoryViewSet
+
+        create_categories(admin_client)
+        filter_queryset = CategoryViewSet.filter_queryset
+
+        def filter_and_write(view, queryset):
+            # A write of another request lands while the list is built.
+            category_cache.invalidate()
+            return filter_queryset(view, queryset)
+
+        monkeypatch.setattr(
+            CategoryViewSet, 'filter_queryset', filter_and_write
+        )
+        client.get(self.CATEGORY_URL)
+        monkeypatch.undo()
+        response = client.get(self.CATEGORY_URL)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что ответ, собранный до записи, не сохраняется в '
+            'кэш под новым поколением.'
+        )
+
+    def test_05_links_of_other_host(self, client):
+        from reviews.models import Category
+
+        Category.objects.bulk_create(
+            Category(name=f'Категория {number}', slug=f'category-{number}')
+            for number in range(15)
+        )
+        client.get(self.CATEGORY_URL, HTTP_HOST='first.example')
+        response = client.get(self.CATEGORY_URL, HTTP_HOST='second.example')
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['next'].startswith('http://second.example/'), (
+            'Проверьте, что ключ кэша учитывает хост, который попадает в '
+            'ссылки пагинации.'
+        )
@@ -0,0 +1,130 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_catalog
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ConditionalGet:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    CATEGORY_URL = '/api/v1/categories/'
+
+    def assert_not_modified(self, client, url, etag):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным заголовком '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        assert response['ETag'] == etag
+        assert not response.content
+
+    def test_01_title_detail(self, client, admin_client, user_client,
+                             django_assert_num_queries):
+        title = create_catalog(1)[0]
+        url = self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=title.id)
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response['ETag']
+        assert etag, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовок `ETag`.'
+        )
+
+        with django_assert_num_queries(1):
+            self.assert_not_modified(client, url, etag)
+
+        user_client.post(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title.id),
+            data={'text': 'Отлично', 'score': 10}
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что `ETag` произведения меняется после создания '
+            'отзыва.'
+        )
+        assert response.json()['rating'] == 10
+        etag = response['ETag']
+
+        admin_client.patch(url, data={'description': 'Новое описание'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что `ETag` произведения меняется после его '
+            'изменения.'
+        )
+
+    def test_02_title_list_and_reviews(self, client, user_client):
+        title = create_catalog(2)[0]
+        response = client.get(self.TITLES_URL)
+        etag = response['ETag']
+        self.assert_not_modified(client, self.TITLES_URL, etag)
+
+        response = client.get(self.TITLES_URL, {'year': 2000})
+        assert response['ETag'] != etag, (
+            'Проверьте, что `ETag` списка зависит от параметров запроса.'
+        )
+
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        reviews_etag = client.get(reviews_url)['ETag']
+        self.assert_not_modified(client, reviews_url, reviews_etag)
+
+        user_client.post(reviews_url, data={'text': 'Хорошо', 'score': 8})
+        assert client.get(reviews_url)['ETag'] != reviews_etag
+        response = client.get(self.TITLES_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что `ETag` списка произведений меняется после '
+            'создания отзыва.'
+        )
+
+    def test_03_category_list(self, client, admin_client):
+        etag = client.get(self.CATEGORY_URL)['ETag']
+        self.assert_not_modified(client, self.CATEGORY_URL, etag)
+        admin_client.post(
+            self.CATEGORY_URL, data={'name': 'Музыка', 'slug': 'music'}
+        )
+        response = client.get(self.CATEGORY_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_04_missing_title(self, client):
+        response = client.get(
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=999),
+            HTTP_IF_NONE_MATCH='*'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_05_reviews_etag_without_title_write(self, client, settings,
+                                                 user_client):
+        from reviews.models import Title
+        from reviews.rating import title_refresh
+
+        settings.JOBS_EAGER = False
+        settings.RATING_REFRESH_DELAY = 60
+        title = create_catalog(1)[0]
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        etag = client.get(reviews_url)['ETag']
+        review_id = user_client.post(
+            reviews_url, data={'text': 'Хорошо', 'score': 8}
+        ).json()['id']
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что `ETag` списка отзывов меняется сразу после '
+            'записи отзыва, не дожидаясь фоновой задачи.'
+        )
+        etag = response['ETag']
+        user_client.post(
+            f'{reviews_url}{review_id}/comments/', data={'text': 'Да'}
+        )
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что `ETag` списка отзывов меняется вместе с '
+            'количеством комментариев.'
+        )
+        assert Title.objects.get(pk=title.id).version == 0, (
+            'Проверьте, что запись отзывов и комментариев не обновляет '
+            'строку произведения в запросе.'
+        )
+        settings.JOBS_EAGER = True
+        title_refresh.flush()
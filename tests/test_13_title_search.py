@@ -0,0 +1,62 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def create_titles(self):
+        from reviews.models import Title
+
+        return {
+            'godfather': Title.objects.create(
+                name='Крестный отец', year=1972,
+                description='Сага о семье Корлеоне'
+            ),
+            'godfather_2': Title.objects.create(
+                name='Крестный отец 2', year=1974,
+                description='Продолжение истории'
+            ),
+            'shawshank': Title.objects.create(
+                name='Побег из Шоушенка', year=1994,
+                description='Крестный путь к свободе'
+            ),
+        }
+
+    def search(self, client, text):
+        response = client.get(self.TITLES_URL, {'search': text})
+        assert response.status_code == HTTPStatus.OK
+        return [title['id'] for title in response.json()['results']]
+
+    def test_01_search_ranked(self, client):
+        titles = self.create_titles()
+        found = self.search(client, 'крестный')
+        assert set(found) == {title.id for title in titles.values()}, (
+            'Проверьте, что параметр `search` ищет по названию и описанию '
+            'произведения без учёта регистра.'
+        )
+        assert found[-1] == titles['shawshank'].id, (
+            'Проверьте, что результаты поиска упорядочены по релевантности.'
+        )
+        assert self.search(client, 'корлеон') == [titles['godfather'].id], (
+            'Проверьте, что поиск находит слова по префиксу.'
+        )
+        assert self.search(client, 'отец 2') == [titles['godfather_2'].id]
+        assert self.search(client, '"*') == []
+
+    def test_02_index_follows_changes(self, client, admin_client):
+        titles = self.create_titles()
+        title = titles['shawshank']
+        title.name = 'Зеленая миля'
+        title.description = ''
+        title.save()
+        assert self.search(client, 'шоушенка') == []
+        assert self.search(client, 'миля') == [title.id], (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'произведения.'
+        )
+        titles['godfather'].delete()
+        assert self.search(client, 'крестный') == [titles['godfather_2'].id]
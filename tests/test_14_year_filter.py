@@ -0,0 +1,58 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14YearFilter:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def titles(self):
+        from reviews.models import Title
+
+        return {
+            year: Title.objects.create(name=f'Фильм {year}', year=year)
+            for year in (1957, 1984, 1988, 2001)
+        }
+
+    def get_years(self, client, params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK
+        return sorted(title['year'] for title in response.json()['results'])
+
+    def test_01_year_lookups(self, client, titles):
+        assert self.get_years(client, {'year': 1984}) == [1984]
+        assert self.get_years(client, {'year': 198}) == [], (
+            'Проверьте, что фильтр `year` ищет точное совпадение года.'
+        )
+        assert self.get_years(
+            client, {'year_min': 1984, 'year_max': 2000}
+        ) == [1984, 1988], (
+            'Проверьте, что фильтры `year_min` и `year_max` ограничивают '
+            'диапазон годов включительно.'
+        )
+        assert self.get_years(
+            client, {'year__in': '1957,2001'}
+        ) == [1957, 2001]
+
+    def test_02_invalid_year(self, client, titles):
+        response = client.get(self.TITLES_URL, {'year': 'дветыщи'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    @pytest.mark.parametrize('params', (
+        {'year': '1984'},
+        {'year_min': '1980', 'year_max': '1990'},
+        {'year__in': '1957,2001'},
+    ))
+    def test_03_year_index_used(self, titles, params):
+        from api.filters import TitleFilter
+        from reviews.models import Title
+
+        queryset = TitleFilter(params, queryset=Title.objects.all()).qs
+        plan = queryset.explain()
+        assert 'USING INDEX reviews_title_year_' in plan, (
+            'Проверьте, что фильтрация по году использует индекс поля '
+            f'`year`. План запроса: {plan}'
+        )
@@ -0,0 +1,88 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TitleFacets:
+
+    FACETS_URL = '/api/v1/titles/facets/'
+
+    def test_01_facet_counts(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get(self.FACETS_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.FACETS_URL}` возвращает '
+            'ответ со статусом 200.'
+        )
+        data = response.json()
+        assert data['count'] == 2
+        assert data['category'] == [
+            {'slug': 'books', 'name': 'Книги', 'count': 1},
+            {'slug': 'films', 'name': 'Фильм', 'count': 1},
+        ]
+        assert data['genre'] == [
+            {'slug': 'drama', 'name': 'Драма', 'count': 1},
+            {'slug': 'comedy', 'name': 'Комедия', 'count': 1},
+            {'slug': 'horror', 'name': 'Ужасы', 'count': 1},
+        ]
+        assert data['decade'] == [{'decade': 1980, 'count': 2}]
+
+    def test_02_facets_follow_filters(self, client, admin_client):
+        create_titles(admin_client)
+        data = client.get(self.FACETS_URL, {'genre': 'drama'}).json()
+        assert data['count'] == 1, (
+            'Проверьте, что фасеты учитывают параметры фильтрации '
+            'произведений.'
+        )
+        assert data['category'] == [
+            {'slug': 'books', 'name': 'Книги', 'count': 1}
+        ]
+        assert data['genre'] == [
+            {'slug': 'drama', 'name': 'Драма', 'count': 1}
+        ]
+
+    def test_03_facets_cached(self, client, admin_client,
+                              django_assert_num_queries):
+        create_titles(admin_client)
+        client.get(self.FACETS_URL)
+        with django_assert_num_queries(0):
+            client.get(self.FACETS_URL)
+
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Матрица', 'year': 1999,
+            'genre': ['drama'], 'category': 'films'
+        })
+        data = client.get(self.FACETS_URL).json()
+        assert data['count'] == 3, (
+            'Проверьте, что кэш фасетов сбрасывается при добавлении '
+            'произведения.'
+        )
+        assert data['decade'] == [
+            {'decade': 1980, 'count': 2}, {'decade': 1990, 'count': 1}
+        ]
+
+    def test_04_facets_with_search(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get(self.FACETS_URL, {'search': 'терминатор'})
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что фасеты работают вместе с параметром `search`.'
+        )
+        data = response.json()
+        assert data['count'] == 1
+        assert data['decade'] == [{'decade': 1980, 'count': 1}]
+        assert len(data['genre']) == 2
+
+    def test_05_facets_kept_on_review(self, client, admin_client,
+                                      django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        client.get(self.FACETS_URL)
+        response = admin_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data={'text': 'Отзыв', 'score': 5}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        with django_assert_num_queries(0):
+            client.get(self.FACETS_URL)
@@ -0,0 +1,118 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16LoadCsv:
+
+    @pytest.mark.parametrize('options', (
+        {},
+        {'workers': 2, 'shard_size': 2000},
+    ))
+    def test_01_load_all_tables(self, options):
+        from reviews.models import (Category, Comment, Genre, Review, Title,
+                                    TitleGenre, User)
+
+        call_command('load_csv', stdout=StringIO(), **options)
+
+        counts = {
+            model: model.objects.count()
+            for model in (User, Category, Genre, Title, TitleGenre, Review,
+                          Comment)
+        }
+        assert all(counts.values()), (
+            'Проверьте, что команда `load_csv` загружает все таблицы, '
+            f'включая связи жанров и произведений: {counts}'
+        )
+        title = Title.objects.get(pk=1)
+        assert title.category_id == 1
+        assert title.genre.exists()
+        assert title.review_count == title.reviews.count(), (
+            'Проверьте, что после загрузки пересчитываются счётчики отзывов.'
+        )
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что дата публикации отзыва берётся из файла.'
+        )
+        assert review.text.startswith('Ставлю десять звёзд!\n'), (
+            'Проверьте, что многострочные значения не разбиваются при '
+            'разделении файла на части.'
+        )
+
+    def test_02_upsert(self):
+        from reviews.models import Review, Title
+
+        call_command('load_csv', stdout=StringIO())
+        Title.objects.filter(pk=1).update(name='Изменённое название')
+        Review.objects.filter(pk=3).delete()
+        Review.objects.filter(pk=4).update(text='Изменённый отзыв')
+        versions = dict(Title.objects.values_list('pk', 'version'))
+
+        out = StringIO()
+        call_command('load_csv', upsert=True, stdout=out)
+
+        output = out.getvalue()
+        assert 'Titles: 0 inserted, 1 updated, 31 unchanged' in output, (
+            'Проверьте, что в режиме `--upsert` команда `load_csv` '
+            'обновляет только изменённые строки и сообщает их количество.'
+        )
+        assert 'Reviews: 1 inserted, 1 updated, 70 unchanged' in output
+        assert 'Comments: 0 inserted, 0 updated, 3 unchanged' in output
+        title = Title.objects.get(pk=1)
+        assert title.name == 'Побег из Шоушенка'
+        assert title.version == versions[1] + 1
+        assert Review.objects.filter(pk=3).exists()
+        assert Title.objects.get(pk=2).version > versions[2], (
+            'Проверьте, что в режиме `--upsert` версия произведения '
+            'меняется, когда меняются его отзывы и счётчики.'
+        )
+        assert Title.objects.get(pk=3).version == versions[3]
+
+    def test_03_dump_round_trip(self, tmp_path):
+        from reviews.models import (Category, Comment, Genre, Review, Title,
+                                    TitleGenre, User)
+
+        from reviews.management.commands.dump_csv import COLUMNS
+
+        def get_rows(model):
+            return sorted(model.objects.values_list(*(
+                model._meta.get_field(column).attname
+                for column in COLUMNS[model]
+            )))
+
+        call_command('load_csv', stdout=StringIO())
+        call_command('dump_csv', output=str(tmp_path), stdout=StringIO())
+        expected = {
+            model: get_rows(model)
+            for model in (User, Title, TitleGenre, Review, Comment)
+        }
+        assert (tmp_path / 'genre_title.csv').exists(), (
+            'Проверьте, что команда `dump_csv` выгружает связи жанров и '
+            'произведений.'
+        )
+
+        for model in (Comment, Review, Title, Category, Genre, User):
+            model.objects.all().delete()
+        call_command('load_csv', path=str(tmp_path), stdout=StringIO())
+
+        for model, rows in expected.items():
+            assert get_rows(model) == rows, (
+                'Проверьте, что выгрузка `dump_csv` загружается обратно '
+                f'командой `load_csv` без изменений: {model.__name__}.'
+            )
+
+    def test_04_dump_ndjson_gzip(self, tmp_path):
+        import gzip
+        import json
+
+        call_command('load_csv', stdout=StringIO())
+        call_command('dump_csv', output=str(tmp_path), format='ndjson',
+                     gzip=True, stdout=StringIO())
+        with gzip.open(tmp_path / 'comments.ndjson.gz', 'rt') as file:
+            comments = [json.loads(line) for line in file]
+        assert len(comments) == 3
+        assert set(comments[0]) == {
+            'id', 'review_id', 'text', 'author', 'pub_date'
+        }
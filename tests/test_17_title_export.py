@@ -0,0 +1,69 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_catalog
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17TitleExport:
+
+    EXPORT_URL = '/api/v1/titles/export/'
+
+    def read_lines(self, response):
+        content = b''.join(response.streaming_content).decode()
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_01_export_not_admin(self, client, user_client,
+                                 moderator_client):
+        create_catalog(1)
+        assert client.get(self.EXPORT_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+        for api_client in (user_client, moderator_client):
+            response = api_client.get(self.EXPORT_URL)
+            assert response.status_code == HTTPStatus.FORBIDDEN, (
+                'Проверьте, что выгрузка произведений доступна только '
+                'администратору.'
+            )
+
+    def test_02_export_ndjson(self, admin_client):
+        titles = create_catalog(3)
+        response = admin_client.get(self.EXPORT_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            'Проверьте, что выгрузка произведений отдаётся потоком.'
+        )
+        assert response['Content-Type'] == 'application/x-ndjson'
+        lines = self.read_lines(response)
+        assert [line['id'] for line in lines] == [t.id for t in titles]
+        listed = admin_client.get(f'/api/v1/titles/{titles[0].id}/').json()
+        assert lines[0] == listed, (
+            'Проверьте, что строка выгрузки совпадает с ответом '
+            '`/api/v1/titles/{title_id}/`.'
+        )
+
+    def test_03_export_filter(self, admin_client):
+        titles = create_catalog(3)
+        response = admin_client.get(
+            self.EXPORT_URL, {'name': titles[1].name}
+        )
+        assert [line['id'] for line in self.read_lines(response)] == [
+            titles[1].id
+        ]
+
+    def test_04_export_queries(self, admin_client, monkeypatch,
+                               django_assert_num_queries):
+        from api.views import TitleViewSet
+
+        monkeypatch.setattr(TitleViewSet, 'export_chunk_size', 2)
+        create_catalog(5)
+        # User, titles cursor and genres of 3 chunks.
+        with django_assert_num_queries(5):
+            response = admin_client.get(self.EXPORT_URL)
+            lines = self.read_lines(response)
+        assert len(lines) == 5, (
+            'Проверьте, что жанры выгружаются одним запросом на пачку '
+            'произведений.'
+        )
@@ -0,0 +1,173 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import (create_catalog, create_single_comment,
+                         create_single_review)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18AuthorQueries:
+
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+    COMMENT_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        '{comment_id}/'
+    )
+
+    def create_review(self, user_client):
+        title_id = create_catalog(1)[0].id
+        review_id = create_single_review(
+            user_client, title_id, 'Отлично', 9
+        ).json()['id']
+        return title_id, review_id
+
+    def create_comment(self, user_client):
+        title_id, review_id = self.create_review(user_client)
+        comment_id = create_single_comment(
+            user_client, title_id, review_id, 'Согласен'
+        ).json()['id']
+        return title_id, review_id, comment_id
+
+    def test_01_review_patch_queries(self, user_client,
+                                     django_assert_num_queries):
+        title_id, review_id = self.create_review(user_client)
+        url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review_id
+        )
+        # Title and review, an update of the review and the eager recount
+        # job, which alone writes the title; the user is cached since the
+        # review was created.
+        with django_assert_num_queries(6):
+            response = user_client.patch(url, data={'score': 10})
+        assert response.status_code == HTTPStatus.OK
+
+    def test_02_review_delete_queries(self, user_client,
+                                      django_assert_num_queries):
+        title_id, review_id = self.create_review(user_client)
+        url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review_id
+        )
+        # Title, review and its comments, then BEGIN, a delete of the
+        # review and the eager recount job: a grouped count, a select and
+        # an update of the title.
+        with django_assert_num_queries(8):
+            response = user_client.delete(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+
+    def test_03_comment_patch_queries(self, user_client,
+                                      django_assert_num_queries):
+        title_id, review_id, comment_id = self.create_comment(user_client)
+        url = self.COMMENT_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review_id, comment_id=comment_id
+        )
+        # Review and comment, then BEGIN and an update.
+        with django_assert_num_queries(4):
+            response = user_client.patch(url, data={'text': 'Не согласен'})
+        assert response.status_code == HTTPStatus.OK
+
+    def test_04_comment_delete_queries(self, user_client,
+                                       django_assert_num_queries):
+        title_id, review_id, comment_id = self.create_comment(user_client)
+        url = self.COMMENT_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review_id, comment_id=comment_id
+        )
+        # Review and comment, then BEGIN, a delete and an update of the
+        # review counter; the title row is not touched.
+        with django_assert_num_queries(5):
+            response = user_client.delete(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+
+    def test_05_not_author_forbidden(self, user_client, moderator,
+                                     django_assert_num_queries):
+        from reviews.models import Comment
+
+        title_id, review_id, comment_id = self.create_comment(user_client)
+        Comment.objects.filter(pk=comment_id).update(author=moderator)
+        url = self.COMMENT_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review_id, comment_id=comment_id
+        )
+        with django_assert_num_queries(2):
+            response = user_client.delete(url)
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что DELETE-запрос пользователя с ролью `user` к '
+            'чужому комментарию возвращает ответ со статусом 403.'
+        )
+
+    def test_06_review_create_queries(self, user_client,
+                                      django_assert_num_queries):
+        title_id = create_catalog(1)[0].id
+        # User and title once, then BEGIN, an insert and the eager recount
+        # job; duplicates are left to the unique constraint.
+        with django_assert_num_queries(7):
+            response = create_single_review(
+                user_client, title_id, 'Отлично', 9
+            )
+        assert response.status_code == HTTPStatus.CREATED
+
+    def test_07_review_duplicate(self, user_client,
+                                 django_assert_num_queries):
+        from reviews.models import Review, Title
+
+        title_id, _ = self.create_review(user_client)
+        # Title, then BEGIN, the rejected insert and the duplicate check.
+        with django_assert_num_queries(4):
+            response = user_client.post(
+                f'/api/v1/titles/{title_id}/reviews/',
+                data={'text': 'Ещё раз', 'score': 1}
+            )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что повторный отзыв на то же произведение '
+            'возвращает ответ со статусом 400.'
+        )
+        assert 'non_field_errors' in response.json()
+        title = Title.objects.get(pk=title_id)
+        assert Review.objects.filter(title=title).count() == 1
+        assert (title.review_count, title.score_sum) == (1, 9), (
+            'Проверьте, что отклонённый отзыв не меняет счётчики '
+            'произведения.'
+        )
+
+    def test_08_comment_create_queries(self, user_client,
+                                       django_assert_num_queries):
+        title_id, review_id = self.create_review(user_client)
+        # Review with its title checked in one query, then BEGIN, an
+        # insert and an update of the review counter.
+        with django_assert_num_queries(4):
+            response = create_single_comment(
+                user_client, title_id, review_id, 'Согласен'
+            )
+        assert response.status_code == HTTPStatus.CREATED
+
+    def test_09_comment_title_mismatch(self, user_client):
+        from reviews.models import Title
+
+        _, review_id = self.create_review(user_client)
+        other_title_id = Title.objects.create(name='Другое', year=2001).id
+        response = user_client.get(
+            f'/api/v1/titles/{other_title_id}/reviews/{review_id}/comments/'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что запрос к комментариям отзыва через чужое '
+            'произведение возвращает ответ со статусом 404.'
+        )
+
+    def test_10_review_other_integrity_error(self, user_client,
+                                             monkeypatch):
+        from django.db import IntegrityError
+
+        from api.serializers import ReviewSerializer
+
+        title_id = create_catalog(1)[0].id
+
+        def save(serializer, **kwargs):
+            raise IntegrityError('NOT NULL constraint failed')
+
+        monkeypatch.setattr(ReviewSerializer, 'save', save)
+        with pytest.raises(IntegrityError):
+            user_client.post(
+                f'/api/v1/titles/{title_id}/reviews/',
+                data={'text': 'Отлично', 'score': 9}
+            )
@@ -0,0 +1,126 @@
+import time
+
+import pytest
+
+from tests.utils import create_catalog
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19BackgroundJobs:
+
+    def test_01_buffer_coalesces_keys(self, settings):
+        from api_yamdb.jobs import CoalescingBuffer, JobQueue
+
+        settings.JOBS_EAGER = False
+        settings.RATING_REFRESH_DELAY = 60
+        calls = []
+        jobs = JobQueue()
+        buffer = CoalescingBuffer(calls.append, 'RATING_REFRESH_DELAY', jobs)
+        for key in (1, 1, 2, 1):
+            buffer.add(key)
+        assert calls == [], (
+            'Проверьте, что задачи буфера откладываются до истечения '
+            'задержки.'
+        )
+        buffer.flush()
+        jobs.join()
+        assert calls == [{1, 2}], (
+            'Проверьте, что повторные ключи объединяются в одну задачу.'
+        )
+
+    def test_02_buffer_staleness_bound(self, settings):
+        from api_yamdb.jobs import CoalescingBuffer, JobQueue
+
+        settings.JOBS_EAGER = False
+        settings.RATING_REFRESH_DELAY = 0.05
+        calls = []
+        jobs = JobQueue()
+        buffer = CoalescingBuffer(calls.append, 'RATING_REFRESH_DELAY', jobs)
+        buffer.add(1)
+        deadline = time.monotonic() + 5
+        while not calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert calls == [{1}], (
+            'Проверьте, что буфер сам передаёт ключи в очередь задач '
+            'по истечении `RATING_REFRESH_DELAY`.'
+        )
+
+    def test_03_rating_refresh_deferred(self, settings, admin, user,
+                                        moderator):
+        from api_yamdb.jobs import job_queue
+        from reviews.models import Review, Title
+        from reviews.rating import title_refresh
+
+        settings.JOBS_EAGER = False
+        settings.RATING_REFRESH_DELAY = 60
+        title = create_catalog(1)[0]
+        for author, score in ((admin, 10), (user, 4), (moderator, 7)):
+            Review.objects.create(
+                title=title, author=author, text='Текст', score=score
+            )
+        title.refresh_from_db()
+        assert (title.review_count, title.rating) == (0, None), (
+            'Проверьте, что рейтинг пересчитывается в фоне, а не в запросе.'
+        )
+        assert title.version == 0, (
+            'Проверьте, что запись отзыва не обновляет строку '
+            'произведения в транзакции запроса.'
+        )
+
+        title_refresh.flush()
+        job_queue.join()
+
+        title = Title.objects.get(pk=title.pk)
+        assert (title.review_count, title.score_sum, title.rating) == (
+            3, 21, 7
+        )
+        assert title.version == 1, (
+            'Проверьте, что серия отзывов на одно произведение приводит к '
+            'одному пересчёту рейтинга.'
+        )
+
+    def test_04_refresh_recounts(self, admin, user):
+        from reviews.models import Review, Title
+
+        title = create_catalog(1)[0]
+        Review.objects.create(title=title, author=admin, text='Текст', score=8)
+        # Counters left wrong, e.g. by a job lost with its process.
+        Title.objects.filter(pk=title.pk).update(
+            review_count=5, score_sum=40, rating=8
+        )
+        Review.objects.create(title=title, author=user, text='Текст', score=4)
+        title = Title.objects.get(pk=title.pk)
+        assert (title.review_count, title.score_sum, title.rating) == (
+            2, 12, 6
+        ), (
+            'Проверьте, что фоновая задача пересчитывает счётчики по '
+            'отзывам, а не сдвигает их.'
+        )
+
+    def test_05_deferred_update_and_delete(self, settings, admin, user):
+        from api_yamdb.jobs import job_queue
+        from reviews.models import Review, Title
+        from reviews.rating import title_refresh
+
+        settings.JOBS_EAGER = False
+        settings.RATING_REFRESH_DELAY = 60
+        title = create_catalog(1)[0]
+        review = Review.objects.create(
+            title=title, author=admin, text='Текст', score=10
+        )
+        Review.objects.create(title=title, author=user, text='Текст', score=4)
+        review = Review.objects.get(pk=review.pk)
+        review.score = 6
+        review.save()
+        Review.objects.filter(author=user).get().delete()
+
+        title_refresh.flush()
+        job_queue.join()
+
+        title = Title.objects.get(pk=title.pk)
+        assert (title.review_count, title.score_sum, title.rating) == (
+            1, 6, 6
+        ), (
+            'Проверьте, что изменение оценки и удаление отзыва сдвигают '
+            'счётчики произведения.'
+        )
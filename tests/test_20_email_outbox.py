@@ -0,0 +1,139 @@
+import smtplib
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.core.mail.backends.locmem import EmailBackend
+from django.utils import timezone
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20EmailOutbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def signup(self, client, number):
+        response = client.post(self.URL_SIGNUP, data={
+            'email': f'user{number}@yamdb.fake',
+            'username': f'user{number}',
+        })
+        assert response.status_code == HTTPStatus.OK
+
+    def test_01_signup_uses_outbox(self, client):
+        from users.models import OutgoingEmail
+
+        self.signup(client, 1)
+        email = OutgoingEmail.objects.get()
+        assert email.to == 'user1@yamdb.fake'
+        assert email.sent_at is not None, (
+            'Проверьте, что письмо из очереди помечается как отправленное.'
+        )
+        assert email.body == '', (
+            'Проверьте, что текст письма с кодом подтверждения удаляется '
+            'после отправки.'
+        )
+        assert len(mail.outbox) == 1
+
+    def test_02_batch_over_one_connection(self, client, settings,
+                                          monkeypatch):
+        from api_yamdb.jobs import job_queue
+        from users import outbox
+
+        settings.JOBS_EAGER = False
+        settings.EMAIL_OUTBOX_DELAY = 60
+        connections = []
+
+        def get_connection(*args, **kwargs):
+            connections.append(EmailBackend(*args, **kwargs))
+            return connections[-1]
+
+        monkeypatch.setattr(outbox, 'get_connection', get_connection)
+        for number in range(3):
+            self.signup(client, number)
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что регистрация только ставит письмо в очередь.'
+        )
+
+        outbox.outbox_flush.flush()
+        job_queue.join()
+
+        assert sorted(message.to[0] for message in mail.outbox) == [
+            f'user{number}@yamdb.fake' for number in range(3)
+        ]
+        assert len(connections) == 1, (
+            'Проверьте, что пачка писем отправляется через одно '
+            'соединение.'
+        )
+
+    def test_03_retry_failed_email(self, client, settings, monkeypatch):
+        from users.models import OutgoingEmail
+        from users.outbox import send_pending
+
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+
+        def send_messages(self, messages):
+            raise smtplib.SMTPServerDisconnected('Connection lost')
+
+        with monkeypatch.context() as patch:
+            patch.setattr(EmailBackend, 'send_messages', send_messages)
+            self.signup(client, 1)
+        email = OutgoingEmail.objects.get()
+        assert (email.sent_at, email.attempts) == (None, 1)
+        assert email.last_error == 'Connection lost'
+        assert email.next_attempt_at > timezone.now(), (
+            'Проверьте, что повторная отправка откладывается.'
+        )
+        assert send_pending() == 0
+
+        OutgoingEmail.objects.update(
+            next_attempt_at=timezone.now() - timedelta(seconds=1)
+        )
+        assert send_pending() == 1
+        email.refresh_from_db()
+        assert (email.attempts, email.last_error) == (2, '')
+        assert email.sent_at is not None
+        assert len(mail.outbox) == 1
+
+    def test_04_given_up_email_cleared(self, client, settings, monkeypatch):
+        from users.models import OutgoingEmail
+
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 1
+
+        def send_messages(self, messages):
+            raise smtplib.SMTPServerDisconnected('Connection lost')
+
+        monkeypatch.setattr(EmailBackend, 'send_messages', send_messages)
+        self.signup(client, 1)
+        email = OutgoingEmail.objects.get()
+        assert (email.sent_at, email.attempts, email.body) == (None, 1, ''), (
+            'Проверьте, что текст письма удаляется после последней '
+            'неудачной попытки.'
+        )
+
+    def test_05_send_emails_purges_old(self, client, settings):
+        from users.models import OutgoingEmail
+
+        for number in range(3):
+            self.signup(client, number)
+        old = timezone.now() - timedelta(
+            seconds=settings.EMAIL_OUTBOX_RETENTION + 1
+        )
+        first, given_up, recent = OutgoingEmail.objects.all()
+        OutgoingEmail.objects.filter(pk=first.pk).update(sent_at=old)
+        OutgoingEmail.objects.filter(pk=given_up.pk).update(
+            sent_at=None,
+            attempts=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+            next_attempt_at=old
+        )
+
+        out = StringIO()
+        call_command('send_emails', stdout=out)
+
+        assert '2 old emails deleted' in out.getvalue()
+        assert list(OutgoingEmail.objects.all()) == [recent], (
+            'Проверьте, что команда `send_emails` удаляет старые '
+            'отправленные и отклонённые письма.'
+        )
@@ -0,0 +1,81 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21ConfirmationCodes:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+    USER_DATA = {'email': 'coder@yamdb.fake', 'username': 'coder'}
+
+    def signup(self, client):
+        response = client.post(self.URL_SIGNUP, data=self.USER_DATA)
+        assert response.status_code == HTTPStatus.OK
+        return re.search(r'\d{6}', mail.outbox[-1].body).group()
+
+    def get_token(self, client, code):
+        return client.post(self.URL_TOKEN, data={
+            'username': self.USER_DATA['username'],
+            'confirmation_code': code,
+        })
+
+    def test_01_code_is_single_use(self, client, django_assert_num_queries):
+        code = self.signup(client)
+        with django_assert_num_queries(1):
+            response = self.get_token(client, code)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что код подтверждения из письма позволяет получить '
+            'токен, а запрос обращается к БД только за пользователем.'
+        )
+        assert 'token' in response.json()
+        response = self.get_token(client, code)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что код подтверждения можно использовать только '
+            'один раз.'
+        )
+
+    def test_02_new_code_replaces_old(self, client):
+        old_code = self.signup(client)
+        new_code = self.signup(client)
+        if old_code != new_code:
+            assert self.get_token(client, old_code).status_code == (
+                HTTPStatus.BAD_REQUEST
+            ), 'Проверьте, что новый код подтверждения заменяет старый.'
+        assert self.get_token(client, new_code).status_code == HTTPStatus.OK
+
+    def test_03_code_expires(self, client, settings):
+        settings.CONFIRMATION_CODE_TTL = 0
+        code = self.signup(client)
+        assert self.get_token(client, code).status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), 'Проверьте, что код подтверждения перестаёт действовать по TTL.'
+
+    def test_04_code_dropped_after_failures(self, client, settings):
+        settings.CONFIRMATION_CODE_MAX_FAILURES = 3
+        code = self.signup(client)
+        wrong = f'{(int(code) + 1) % 1000000:06d}'
+        for _ in range(2):
+            assert self.get_token(client, wrong).status_code == (
+                HTTPStatus.BAD_REQUEST
+            )
+        assert self.get_token(client, code).status_code == HTTPStatus.OK, (
+            'Проверьте, что код действует, пока не исчерпаны попытки.'
+        )
+
+        code = self.signup(client)
+        for _ in range(3):
+            self.get_token(client, wrong)
+        assert self.get_token(client, code).status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), (
+            'Проверьте, что код подтверждения перестаёт действовать после '
+            '`CONFIRMATION_CODE_MAX_FAILURES` неверных попыток.'
+        )
+        code = self.signup(client)
+        assert self.get_token(client, code).status_code == HTTPStatus.OK, (
+            'Проверьте, что новый код сбрасывает счётчик неверных попыток.'
+        )
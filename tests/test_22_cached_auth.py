@@ -0,0 +1,107 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22CachedAuthentication:
+
+    CATEGORIES_URL = '/api/v1/categories/'
+    USERS_URL = '/api/v1/users/'
+
+    def test_01_user_is_cached(self, user_client,
+                               django_assert_num_queries):
+        assert user_client.get(self.CATEGORIES_URL).status_code == (
+            HTTPStatus.OK
+        )
+        with django_assert_num_queries(0):
+            response = user_client.get(self.CATEGORIES_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что повторный запрос с тем же токеном не загружает '
+            'пользователя из БД.'
+        )
+
+    def test_02_inactive_user_rejected(self, user, user_client):
+        assert user_client.get(self.CATEGORIES_URL).status_code == (
+            HTTPStatus.OK
+        )
+        user.is_active = False
+        user.save()
+        response = user_client.get(self.CATEGORIES_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что сохранение пользователя сбрасывает его запись '
+            'в кэше аутентификации.'
+        )
+
+    def test_03_role_change_applies_to_tokens(self, admin_client, user,
+                                              user_client):
+        assert user_client.get(self.USERS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        response = admin_client.patch(
+            f'{self.USERS_URL}{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert user_client.get(self.USERS_URL).status_code == HTTPStatus.OK, (
+            'Проверьте, что новая роль сразу действует для выданных '
+            'токенов пользователя.'
+        )
+
+    def test_04_profile_patch_keeps_role(self, user, user_client):
+        response = user_client.patch(
+            f'{self.USERS_URL}me/', data={'bio': 'Новое описание'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        user.refresh_from_db()
+        assert (user.bio, user.role, user.email) == (
+            'Новое описание', 'user', 'testuser@yamdb.fake'
+        )
+        assert user_client.get(self.CATEGORIES_URL).status_code == (
+            HTTPStatus.OK
+        ), 'Проверьте, что изменение профиля не отзывает токены.'
+
+    def test_05_role_change_revokes_tokens(self, settings, admin_client,
+                                           user, user_client):
+        from api.authentication import get_tokens_for_user
+
+        settings.AUTH_REVOKE_TOKENS_ON_ROLE_CHANGE = True
+        assert user_client.get(self.USERS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        response = admin_client.patch(
+            f'{self.USERS_URL}{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert user_client.get(self.USERS_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), (
+            'Проверьте, что с `AUTH_REVOKE_TOKENS_ON_ROLE_CHANGE` смена '
+            'роли отзывает старые токены пользователя.'
+        )
+
+        user.refresh_from_db()
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Bearer {}'.format(
+            get_tokens_for_user(user).access_token
+        ))
+        assert client.get(self.USERS_URL).status_code == HTTPStatus.OK, (
+            'Проверьте, что новый токен действует с новой ролью.'
+        )
+
+    def test_06_change_seen_by_other_processes(self, monkeypatch, admin,
+                                               admin_client):
+        from api.authentication import user_cache
+
+        assert admin_client.get(self.USERS_URL).status_code == HTTPStatus.OK
+        # Another process only sees the shared cache, not this one's
+        # invalidation.
+        monkeypatch.setattr(user_cache, 'invalidate', lambda user_id: None)
+        admin.role = 'user'
+        admin.save()
+        assert admin_client.get(self.USERS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        ), (
+            'Проверьте, что изменение пользователя сразу действует во всех '
+            'процессах, а не после истечения `AUTH_USER_CACHE_TTL`.'
+        )
@@ -0,0 +1,125 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Throttling:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+
+    def test_01_signup_throttled_per_ip(self, client, monkeypatch):
+        from api.throttling import SignupThrottle
+
+        monkeypatch.setattr(SignupThrottle, 'rate', '2/hour', raising=False)
+        for _ in range(2):
+            response = client.post(self.URL_SIGNUP, data={})
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.post(self.URL_SIGNUP, data={})
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что регистрация ограничена по IP клиента.'
+        )
+        assert int(response['Retry-After']) > 0, (
+            'Проверьте, что ответ 429 содержит заголовок `Retry-After`.'
+        )
+        response = client.post(
+            self.URL_SIGNUP, data={}, REMOTE_ADDR='10.0.0.2'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_token_throttled_per_username(self, client, monkeypatch):
+        from api.throttling import TokenUsernameThrottle
+
+        monkeypatch.setattr(
+            TokenUsernameThrottle, 'rate', '1/hour', raising=False
+        )
+        data = {'username': 'victim', 'confirmation_code': '000000'}
+        response = client.post(self.URL_TOKEN, data=data)
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        response = client.post(
+            self.URL_TOKEN, data=data, REMOTE_ADDR='10.0.0.2'
+        )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что получение токена ограничено по `username` '
+            'независимо от IP клиента.'
+        )
+        response = client.post(
+            self.URL_TOKEN, data={**data, 'username': 'other'}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_writes_throttled_per_user(self, admin_client, user_client,
+                                          monkeypatch):
+        from api.throttling import WriteThrottle
+
+        monkeypatch.setattr(WriteThrottle, 'rate', '1/minute', raising=False)
+        url = '/api/v1/categories/'
+        response = admin_client.post(url, data={'name': 'Фильм',
+                                                'slug': 'movie'})
+        assert response.status_code == HTTPStatus.CREATED
+        response = admin_client.post(url, data={'name': 'Книга',
+                                                'slug': 'book'})
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что изменяющие запросы ограничены для каждого '
+            'пользователя.'
+        )
+        assert admin_client.get(url).status_code == HTTPStatus.OK
+        response = user_client.post(url, data={'name': 'Книга',
+                                               'slug': 'book'})
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+    def test_04_bucket_refills(self, rf, monkeypatch):
+        from api.throttling import SignupThrottle
+
+        now = [1000.0]
+        monkeypatch.setattr(SignupThrottle, 'rate', '2/second', raising=False)
+        monkeypatch.setattr(SignupThrottle, 'timer', lambda self: now[0])
+        throttle = SignupThrottle()
+        request = rf.post(self.URL_SIGNUP)
+        assert throttle.allow_request(request, None)
+        assert throttle.allow_request(request, None)
+        assert not throttle.allow_request(request, None)
+        assert throttle.wait() == pytest.approx(0.5)
+        now[0] += 0.5
+        assert throttle.allow_request(request, None), (
+            'Проверьте, что бакет пополняется со временем.'
+        )
+        assert not throttle.allow_request(request, None)
+
+    def test_05_forwarded_for_ignored(self, client, monkeypatch):
+        from api.throttling import SignupThrottle
+
+        monkeypatch.setattr(SignupThrottle, 'rate', '1/hour', raising=False)
+        response = client.post(
+            self.URL_SIGNUP, data={}, HTTP_X_FORWARDED_FOR='10.0.1.1'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.post(
+            self.URL_SIGNUP, data={}, HTTP_X_FORWARDED_FOR='10.0.1.2'
+        )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что без `NUM_PROXIES` IP клиента не берётся из '
+            'заголовка `X-Forwarded-For`.'
+        )
+
+    def test_06_forwarded_for_behind_proxy(self, rf, settings, monkeypatch):
+        from rest_framework.settings import api_settings
+
+        from api.throttling import SignupThrottle
+
+        monkeypatch.setattr(SignupThrottle, 'rate', '1/hour', raising=False)
+        monkeypatch.setattr(api_settings, 'NUM_PROXIES', 1)
+        throttle = SignupThrottle()
+        request = rf.post(
+            self.URL_SIGNUP, HTTP_X_FORWARDED_FOR='10.0.1.1, 10.0.2.1'
+        )
+        assert throttle.allow_request(request, None)
+        assert not throttle.allow_request(request, None)
+        request = rf.post(
+            self.URL_SIGNUP, HTTP_X_FORWARDED_FOR='10.0.1.1, 10.0.2.2'
+        )
+        assert throttle.allow_request(request, None), (
+            'Проверьте, что за прокси IP клиента берётся из '
+            '`X-Forwarded-For`.'
+        )
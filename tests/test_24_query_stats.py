@@ -0,0 +1,76 @@
+import json
+import logging
+import re
+
+import pytest
+
+from tests.utils import create_catalog
+
+
+@pytest.fixture
+def request_log(caplog):
+    logger = logging.getLogger('api.requests')
+    logger.addHandler(caplog.handler)
+    yield caplog
+    logger.removeHandler(caplog.handler)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24QueryStats:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_server_timing(self, client, django_assert_num_queries):
+        create_catalog(2)
+        with django_assert_num_queries(3) as context:
+            response = client.get(self.TITLES_URL)
+        match = re.fullmatch(
+            r'db;dur=[\d.]+;desc="(\d+) queries", total;dur=[\d.]+',
+            response['Server-Timing']
+        )
+        assert match, (
+            'Проверьте, что ответ содержит заголовок `Server-Timing` с '
+            'временем БД и общим временем запроса.'
+        )
+        assert int(match.group(1)) == len(context)
+
+    def test_02_sampled_log(self, client, settings, request_log):
+        settings.QUERY_STATS_SAMPLE_RATE = 1
+        create_catalog(1)
+        client.get(self.TITLES_URL)
+        record, = request_log.records
+        assert record.levelno == logging.INFO
+        data = json.loads(record.getMessage())
+        assert data['path'] == self.TITLES_URL
+        assert data['status'] == 200
+        assert data['queries'] == 3
+        assert data['slow'] is False
+
+    def test_03_not_sampled(self, client, settings, request_log):
+        settings.QUERY_STATS_SAMPLE_RATE = 0
+        client.get(self.TITLES_URL)
+        assert request_log.records == [], (
+            'Проверьте, что без выборки быстрые запросы не логируются.'
+        )
+
+    def test_04_slow_request_duplicates(self, client, settings,
+                                        request_log, monkeypatch):
+        from api.views import TitleViewSet
+
+        settings.QUERY_STATS_SAMPLE_RATE = 0
+        settings.QUERY_STATS_SLOW_REQUEST = 0
+        create_catalog(3)
+        # Without the genre prefetch every title queries its genres.
+        monkeypatch.setattr(
+            TitleViewSet, 'get_queryset', lambda self: self.queryset
+        )
+        client.get(self.TITLES_URL)
+        record, = request_log.records
+        assert record.levelno == logging.WARNING, (
+            'Проверьте, что медленные запросы логируются как предупреждение.'
+        )
+        data = json.loads(record.getMessage())
+        assert data['slow'] is True
+        assert data['duplicate_queries'] >= 3, (
+            'Проверьте, что в логе отмечаются повторяющиеся SQL-запросы.'
+        )
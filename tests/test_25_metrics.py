@@ -0,0 +1,179 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from tests.utils import create_catalog
+
+
+@pytest.fixture
+def latency():
+    from api.metrics import request_latency
+    request_latency.clear()
+    yield request_latency
+    request_latency.clear()
+
+
+def parse_metrics(response):
+    samples = {}
+    for line in response.content.decode().splitlines():
+        if line.startswith('#'):
+            continue
+        name, value = line.rsplit(' ', 1)
+        samples[name] = float(value)
+    return samples
+
+
+def sample_name(suffix, handler, method, status, bucket=None):
+    labels = f'handler="{handler}",method="{method}",status="{status}"'
+    if bucket is not None:
+        labels += f',le="{bucket}"'
+    return f'http_request_duration_seconds_{suffix}{{{labels}}}'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Metrics:
+
+    TITLES_URL = '/api/v1/titles/'
+    METRICS_URL = '/metrics'
+
+    def test_01_viewset_action(self, client, latency):
+        create_catalog(1)
+        client.get(self.TITLES_URL)
+        client.get(self.TITLES_URL)
+        client.get(f'{self.TITLES_URL}0/')
+        response = client.get(self.METRICS_URL)
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        samples = parse_metrics(response)
+        assert samples[
+            sample_name('count', 'TitleViewSet.list', 'GET', 200)
+        ] == 2, (
+            'Проверьте, что `/metrics` считает запросы по действию '
+            'вьюсета и коду ответа.'
+        )
+        assert samples[
+            sample_name('bucket', 'TitleViewSet.list', 'GET', 200, '+Inf')
+        ] == 2
+        assert samples[
+            sample_name('sum', 'TitleViewSet.list', 'GET', 200)
+        ] > 0
+        assert samples[
+            sample_name('count', 'TitleViewSet.retrieve', 'GET', 404)
+        ] == 1
+
+    def test_02_cumulative_buckets(self, latency):
+        from api.metrics import BUCKETS
+        latency.observe(('View', 'GET', '200'), 0.001)
+        latency.observe(('View', 'GET', '200'), 0.2)
+        latency.observe(('View', 'GET', '200'), 60)
+        lines = latency.render(latency.snapshot())
+        buckets = [
+            int(line.rsplit(' ', 1)[1]) for line in lines
+            if line.startswith('http_request_duration_seconds_bucket')
+        ]
+        assert len(buckets) == len(BUCKETS) + 1
+        assert buckets == sorted(buckets), (
+            'Проверьте, что бакеты гистограммы накопительные.'
+        )
+        assert buckets[0] == 1
+        assert buckets[BUCKETS.index(0.25)] == 2
+        assert buckets[-1] == 3
+
+    def test_03_unmatched_and_method(self, client, latency):
+        client.get('/no-such-page/')
+        client.generic('PROPFIND', self.TITLES_URL)
+        samples = parse_metrics(client.get(self.METRICS_URL))
+        assert samples[sample_name('count', 'unmatched', 'GET', 404)] == 1
+        assert samples[
+            sample_name('count', 'TitleViewSet', 'other', 401)
+        ] == 1, (
+            'Проверьте, что нестандартные методы не создают новых '
+            'значений метки `method`.'
+        )
+
+    def test_04_merge_processes(self, client, settings, tmp_path, latency):
+        settings.METRICS_DIR = str(tmp_path)
+        handler = sample_name('count', 'TitleViewSet.list', 'GET', 200)
+        other = {'http_request_duration_seconds': [
+            [['TitleViewSet.list', 'GET', '200'], [3] + [0] * 11 + [0.003]]
+        ]}
+        (tmp_path / f'{os.getpid() + 1}.json').write_text(json.dumps(other))
+        (tmp_path / 'broken.json').write_text('[')
+        create_catalog(1)
+        client.get(self.TITLES_URL)
+        samples = parse_metrics(client.get(self.METRICS_URL))
+        assert samples[handler] == 4, (
+            'Проверьте, что `/metrics` суммирует данные всех процессов из '
+            '`METRICS_DIR`.'
+        )
+        dump = json.loads((tmp_path / f'{os.getpid()}.json').read_text())
+        assert ['TitleViewSet.list', 'GET', '200'] in [
+            labels for labels, values in dump['http_request_duration_seconds']
+        ]
+
+    def test_05_reused_pid(self, client, settings, tmp_path, latency,
+                           monkeypatch):
+        from api.metrics import store
+
+        settings.METRICS_DIR = str(tmp_path)
+        monkeypatch.setattr(store, 'pid', None)
+        handler = sample_name('count', 'TitleViewSet.list', 'GET', 200)
+        stopped = {'http_request_duration_seconds': [
+            [['TitleViewSet.list', 'GET', '200'], [3] + [0] * 11 + [0.003]]
+        ]}
+        (tmp_path / f'{os.getpid()}.json').write_text(json.dumps(stopped))
+        create_catalog(1)
+        client.get(self.TITLES_URL)
+        samples = parse_metrics(client.get(self.METRICS_URL))
+        assert samples[handler] == 4, (
+            'Проверьте, что новый процесс с тем же pid не затирает данные '
+            'остановленного процесса.'
+        )
+
+    def test_06_stopped_process_archived(self, client, settings, tmp_path,
+                                         latency):
+        settings.METRICS_DIR = str(tmp_path)
+        handler = sample_name('count', 'TitleViewSet.list', 'GET', 200)
+        process = subprocess.Popen([sys.executable, '-c', ''])
+        process.wait()
+        stopped = {'http_request_duration_seconds': [
+            [['TitleViewSet.list', 'GET', '200'], [3] + [0] * 11 + [0.003]]
+        ]}
+        path = tmp_path / f'{process.pid}.json'
+        path.write_text(json.dumps(stopped))
+        for _ in range(2):
+            samples = parse_metrics(client.get(self.METRICS_URL))
+            assert samples[handler] == 3
+        assert not path.exists(), (
+            'Проверьте, что файлы остановленных процессов не накапливаются '
+            'в `METRICS_DIR`.'
+        )
+
+    def test_07_allowed_ips(self, client, settings, latency):
+        response = client.get(self.METRICS_URL, REMOTE_ADDR='10.0.0.2')
+        assert response.status_code == 403, (
+            'Проверьте, что `/metrics` доступен только адресам из '
+            '`METRICS_ALLOWED_IPS`.'
+        )
+        settings.METRICS_ALLOWED_IPS = ['10.0.0.2']
+        response = client.get(self.METRICS_URL, REMOTE_ADDR='10.0.0.2')
+        assert response.status_code == 200
+
+    def test_08_response_cache_counters(self, client, settings, tmp_path,
+                                        latency):
+        from api.metrics import cache_requests
+
+        settings.METRICS_DIR = str(tmp_path)
+        cache_requests.clear()
+        for _ in range(3):
+            client.get('/api/v1/categories/')
+        samples = parse_metrics(client.get(self.METRICS_URL))
+        name = 'response_cache_requests_total'
+        assert samples[f'{name}{{cache="categories",result="miss"}}'] == 1
+        assert samples[f'{name}{{cache="categories",result="hit"}}'] == 2, (
+            'Проверьте, что `/metrics` показывает попадания и промахи '
+            'кэша ответов.'
+        )